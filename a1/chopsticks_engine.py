@@ -0,0 +1,164 @@
+"""
+Code for a Chopsticks engine which plays on positions packed into small
+integers.
+
+A position is a number from 0 to POSITIONS - 1: the hands of player 1
+(left, right) and of player 2 (left, right) as the digits of a number in
+base 5, plus P1_TURN if it is player 1's turn. The position reached by
+every move from every position is worked out once, when this module is
+imported, so listing and making moves are only lookups in TRANSITIONS.
+"""
+import random
+from typing import Any, List, Tuple
+from state import ChopState
+
+MOVES = ['ll', 'lr', 'rl', 'rr']
+
+HAND_POSITIONS = 5 ** 4
+P1_TURN = HAND_POSITIONS
+POSITIONS = 2 * HAND_POSITIONS
+
+# What each hand, in the order of hands_of, is multiplied by in a position.
+PLACES = [125, 25, 5, 1]
+
+# What TRANSITIONS holds for a move which cannot be made.
+NO_POSITION = -1
+
+
+def pack(state: ChopState) -> int:
+    """
+    Return the position that state stands for.
+
+    >>> pack(ChopState(True, [1, 1], [1, 1]))
+    781
+    >>> pack(ChopState(False, [0, 0], [0, 4]))
+    4
+    """
+    position = sum(hand * place for hand, place in
+                   zip([state.p1_left, state.p1_right, state.p2_left,
+                        state.p2_right], PLACES))
+    if state.is_p1_turn:
+        position += P1_TURN
+    return position
+
+
+def hands_of(position: int) -> List[int]:
+    """
+    Return the hands of position: player 1's left and right, then player
+    2's.
+
+    >>> hands_of(781)
+    [1, 1, 1, 1]
+    """
+    hands = position % HAND_POSITIONS
+    return [hands // place % 5 for place in PLACES]
+
+
+def unpack(position: int) -> ChopState:
+    """
+    Return the ChopState that position stands for.
+
+    >>> unpack(781) == ChopState(True, [1, 1], [1, 1])
+    True
+    """
+    hands = hands_of(position)
+    return ChopState(position >= P1_TURN, hands[:2], hands[2:])
+
+
+def build_transitions() -> List[Tuple[int, ...]]:
+    """
+    Return, for every position, the position each of MOVES leads to, or
+    NO_POSITION if that move cannot be made.
+    """
+    transitions = []
+    for position in range(POSITIONS):
+        hands = hands_of(position)
+        mover, target = (0, 2) if position >= P1_TURN else (2, 0)
+        children = []
+        for move in MOVES:
+            source = mover + 'lr'.index(move[0])
+            hit = target + 'lr'.index(move[1])
+            if hands[source] == 0 or hands[hit] == 0:
+                children.append(NO_POSITION)
+                continue
+            child = position % HAND_POSITIONS + PLACES[hit] * (
+                (hands[hit] + hands[source]) % 5 - hands[hit])
+            if position < P1_TURN:
+                child += P1_TURN
+            children.append(child)
+        transitions.append(tuple(children))
+    return transitions
+
+
+# TRANSITIONS[position][i] is the position MOVES[i] leads to from position.
+TRANSITIONS = build_transitions()
+
+# LEGAL_MOVES[position] holds the indices into MOVES of the moves which can
+# be made from position, in the order ChopState.get_possible_moves gives.
+LEGAL_MOVES = [tuple(i for i in range(len(MOVES))
+                     if children[i] != NO_POSITION)
+               for children in TRANSITIONS]
+
+
+def possible_moves(position: int) -> List[str]:
+    """
+    Return the moves which can be made from position.
+
+    >>> possible_moves(pack(ChopState(True, [1, 0], [1, 2])))
+    ['ll', 'lr']
+    """
+    return [MOVES[i] for i in LEGAL_MOVES[position]]
+
+
+def make_move(position: int, move_to_make: str) -> int:
+    """
+    Return the position after making move_to_make from position, or
+    position itself if move_to_make cannot be made, as ChopState does.
+
+    >>> unpack(make_move(pack(ChopState(True, [1, 0], [1, 2])), 'll')) == \\
+    ...     ChopState(False, [1, 0], [2, 2])
+    True
+    >>> make_move(781, 'xx')
+    781
+    """
+    if move_to_make not in MOVES:
+        return position
+    child = TRANSITIONS[position][MOVES.index(move_to_make)]
+    return position if child == NO_POSITION else child
+
+
+def winner(position: int) -> Any:
+    """
+    Return the name of the player who has won at position, or None if the
+    game is not over.
+
+    >>> winner(pack(ChopState(True, [0, 0], [1, 1])))
+    'p2'
+    >>> winner(781) is None
+    True
+    """
+    if LEGAL_MOVES[position]:
+        return None
+    return 'p2' if position >= P1_TURN else 'p1'
+
+
+def random_game(position: int, rng: Any = random,
+                max_moves: int = 1000) -> List[int]:
+    """
+    Return [final position, moves made] of a game played with random moves
+    from position, which stops early after max_moves moves.
+    """
+    moves = 0
+    legal = LEGAL_MOVES[position]
+    while legal and moves < max_moves:
+        position = TRANSITIONS[position][legal[rng.randrange(len(legal))]]
+        legal = LEGAL_MOVES[position]
+        moves += 1
+    return [position, moves]
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from chopsticks_engine import MOVES, POSITIONS, make_move, pack, \
+    possible_moves, random_game, unpack, winner
+from game import Chopsticks
+from state import ChopState
+
+
+class ChopsticksEngineUnitTests(unittest.TestCase):
+    def test_matches_chopstate(self):
+        """
+        Test that every position lists and makes the same moves as the
+        ChopState it stands for, including moves which cannot be made.
+        """
+        for position in range(POSITIONS):
+            state = unpack(position)
+            self.assertEqual(pack(state), position)
+            self.assertEqual(possible_moves(position),
+                             state.get_possible_moves())
+            for move in MOVES + ['xx']:
+                child = state.make_move(move)
+                self.assertEqual(make_move(position, move), pack(child))
+
+    def test_winner_matches_game(self):
+        """
+        Test that winner agrees with Chopsticks.is_winner.
+        """
+        game = Chopsticks(True)
+        for position in range(POSITIONS):
+            game.current_state = unpack(position)
+            for player in ['p1', 'p2']:
+                self.assertEqual(winner(position) == player,
+                                 game.is_winner(player))
+
+    def test_random_games(self):
+        """
+        Test that random games only make possible moves, and either end in
+        a won position or stop at the move limit.
+        """
+        rng = random.Random(0)
+        start = pack(ChopState(True, [1, 1], [1, 1]))
+        for _ in range(100):
+            position, moves = random_game(start, rng, 50)
+            self.assertTrue(winner(position) is not None or moves == 50)
+        rng_1, rng_2 = random.Random(1), random.Random(1)
+        position, moves = random_game(start, rng_1)
+        state = unpack(start)
+        for _ in range(moves):
+            moves_now = state.get_possible_moves()
+            state = state.make_move(moves_now[rng_2.randrange(
+                len(moves_now))])
+        self.assertEqual(pack(state), position)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,227 @@
+"""
+Code for a retrograde solver of Chopsticks and a strategy using it.
+
+Chopsticks has loops, so minimax never finishes on it. Instead, this solves
+every one of its positions backwards from the finished ones. Swapping a
+player's hands changes nothing but the names of the moves, so only the 450
+positions with sorted hands are solved, rather than all 5 ** 4 * 2.
+"""
+from typing import Any, List
+from chopsticks_engine import LEGAL_MOVES, MOVES, P1_TURN, TRANSITIONS, \
+    hands_of, pack
+from chopsticks_engine import POSITIONS as PACKED_POSITIONS
+from state import ChopState, CompactChopState
+from strategy import random_strategy
+
+WIN = 1
+LOSS = -1
+DRAW = 0
+
+# The hands a player can have, with the smaller first: which hand holds
+# which count never matters, so every position is solved with sorted hands.
+HANDS = [[low, high] for high in range(5) for low in range(high + 1)]
+
+POSITIONS = len(HANDS) ** 2 * 2
+
+# The bits of the swaps returned by canonical_of.
+P1_SWAPPED = 1
+P2_SWAPPED = 2
+
+
+def canonical_of_packed(packed: int) -> List[int]:
+    """
+    Return [position, swaps] for the chopsticks_engine position packed, as
+    canonical_of does for a ChopState.
+    """
+    hands = hands_of(packed)
+    swaps = 0
+    if hands[0] > hands[1]:
+        swaps |= P1_SWAPPED
+    if hands[2] > hands[3]:
+        swaps |= P2_SWAPPED
+    p1_hands = HANDS.index(sorted(hands[:2]))
+    p2_hands = HANDS.index(sorted(hands[2:]))
+    position = p1_hands * len(HANDS) + p2_hands
+    if packed >= P1_TURN:
+        position += len(HANDS) ** 2
+    return [position, swaps]
+
+
+# CANONICAL[packed] is canonical_of_packed(packed), for every position of
+# chopsticks_engine.
+CANONICAL = [canonical_of_packed(packed)
+             for packed in range(PACKED_POSITIONS)]
+
+
+def canonical_of(state: ChopState) -> List[int]:
+    """
+    Return [position, swaps]: the number from 0 to POSITIONS - 1 that
+    stands for state once each player's hands are sorted, and which
+    players' hands that swapped (P1_SWAPPED and/or P2_SWAPPED).
+
+    >>> canonical_of(ChopState(True, [3, 1], [2, 2]))
+    [335, 1]
+    >>> canonical_of(ChopState(True, [1, 3], [2, 2]))
+    [335, 0]
+    """
+    return list(CANONICAL[pack(state)])
+
+
+def position_of(state: ChopState) -> int:
+    """
+    Return the number from 0 to POSITIONS - 1 that stands for state, which
+    is the same for every state that differs only in the order of a
+    player's hands.
+
+    >>> position_of(ChopState(True, [1, 1], [1, 1]))
+    257
+    >>> position_of(ChopState(False, [0, 0], [0, 0]))
+    0
+    >>> position_of(ChopState(False, [0, 2], [4, 1])) == \\
+    ...     position_of(ChopState(False, [2, 0], [1, 4]))
+    True
+    """
+    return canonical_of(state)[0]
+
+
+def state_of(position: int) -> ChopState:
+    """
+    Return the ChopState with sorted hands that position stands for.
+
+    >>> state_of(257) == ChopState(True, [1, 1], [1, 1])
+    True
+    """
+    hands = position % len(HANDS) ** 2
+    return ChopState(position >= len(HANDS) ** 2,
+                     list(HANDS[hands // len(HANDS)]),
+                     list(HANDS[hands % len(HANDS)]))
+
+
+def translate(move: Any, swaps: int, is_p1_turn: bool) -> Any:
+    """
+    Return move with its hands swapped to match swaps, which turns a move of
+    a state into the same move of its sorted form, and back again.
+
+    >>> translate('lr', P1_SWAPPED, True)
+    'rr'
+    >>> translate('lr', P1_SWAPPED, False)
+    'll'
+    """
+    if move is None:
+        return None
+    mover, target = [P1_SWAPPED, P2_SWAPPED] if is_p1_turn \
+        else [P2_SWAPPED, P1_SWAPPED]
+    other = {'l': 'r', 'r': 'l'}
+    return (other[move[0]] if swaps & mover else move[0]) + \
+        (other[move[1]] if swaps & target else move[1])
+
+
+class ChopsticksSolver:
+    """
+    A class which records the result of every position of Chopsticks under
+    perfect play.
+
+    Positions whose player to move has no moves are lost. Working backwards,
+    a position is won if some move reaches a lost position, and lost once
+    every move is known to reach a won position. Positions never settled
+    this way can only go round in cycles, so they are draws.
+
+    value - the result (WIN, LOSS or DRAW) for the player to move
+    distance - the number of moves until the game ends, with the winner
+               hurrying and the loser stalling (0 for draws)
+    best_move - a move of the position with sorted hands keeping value and
+                distance, or None if there is none
+    """
+    value: List[int]
+    distance: List[int]
+    best_move: List[Any]
+
+    def __init__(self) -> None:
+        """
+        Initialize a new ChopsticksSolver by solving every position.
+        """
+        self.value = [DRAW] * POSITIONS
+        self.distance = [0] * POSITIONS
+        self.best_move = [None] * POSITIONS
+        children, parents = [], [[] for _ in range(POSITIONS)]
+        for position in range(POSITIONS):
+            packed = pack(state_of(position))
+            moves = [[MOVES[i], CANONICAL[TRANSITIONS[packed][i]][0]]
+                     for i in LEGAL_MOVES[packed]]
+            children.append(moves)
+            for move, child in moves:
+                parents[child].append([move, position])
+        unknown = [len(moves) for moves in children]
+        queue = [position for position in range(POSITIONS)
+                 if not children[position]]
+        for position in queue:
+            self.value[position] = LOSS
+        # queue is visited in order of distance, so a win is settled by its
+        # nearest lost child and a loss by its furthest won child.
+        for child in queue:
+            for move, position in parents[child]:
+                if unknown[position] == 0:
+                    continue
+                if self.value[child] == LOSS:
+                    unknown[position] = 0
+                    self.value[position] = WIN
+                else:
+                    unknown[position] -= 1
+                    if unknown[position] > 0:
+                        continue
+                    self.value[position] = LOSS
+                self.distance[position] = self.distance[child] + 1
+                self.best_move[position] = move
+                queue.append(position)
+        for position in range(POSITIONS):
+            if unknown[position] > 0:
+                self.best_move[position] = self.drawing_move(
+                    children[position])
+
+    def drawing_move(self, moves: List[list]) -> Any:
+        """
+        Return the first move in moves, a list of [move, position] pairs
+        from a drawn position, which reaches a drawn position.
+        """
+        for move, child in moves:
+            if self.value[child] == DRAW:
+                return move
+        return moves[0][0]
+
+    def solve(self, state: ChopState) -> List[Any]:
+        """
+        Return [value, distance, best move] for state, with the best move
+        given in terms of state's own hands.
+
+        >>> solver = ChopsticksSolver()
+        >>> solver.solve(ChopState(True, [0, 0], [1, 1]))
+        [-1, 0, None]
+        >>> solver.solve(ChopState(True, [1, 0], [0, 4]))
+        [1, 1, 'lr']
+        """
+        position, swaps = canonical_of(state)
+        return [self.value[position], self.distance[position],
+                translate(self.best_move[position], swaps, state.is_p1_turn)]
+
+
+# The solved table, built the first time it is needed.
+SOLVER = []
+
+
+def solved_strategy(game: Any) -> str:
+    """
+    Return a best move for game if it is a game of Chopsticks, and a
+    random move otherwise.
+    """
+    if not isinstance(game.current_state, (ChopState, CompactChopState)):
+        return random_strategy(game)
+    if not SOLVER:
+        SOLVER.append(ChopsticksSolver())
+    return SOLVER[0].solve(game.current_state)[2]
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
+    import python_ta
+    python_ta.check_all(config="a1_pyta.txt")
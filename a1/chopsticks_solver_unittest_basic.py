@@ -0,0 +1,107 @@
+import unittest
+
+from chopsticks_solver import ChopsticksSolver, POSITIONS, WIN, LOSS, DRAW, \
+    position_of, state_of, solved_strategy, canonical_of
+from game import Chopsticks
+from state import ChopState
+
+
+class ChopsticksSolverUnitTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.solver = ChopsticksSolver()
+
+    def child_value(self, state, move):
+        """
+        A helper function that returns the solved value of the state reached
+        by applying move to state.
+        """
+        return self.solver.value[position_of(state.make_move(move))]
+
+    def test_positions_round_trip(self):
+        """
+        Test that every position number stands for a different state.
+        """
+        for position in range(POSITIONS):
+            state = state_of(position)
+            self.assertEqual(position_of(state), position)
+
+    def test_values_are_consistent(self):
+        """
+        Test that every solved value follows from the values of the states
+        one move away, and that the best move keeps that value.
+        """
+        for position in range(POSITIONS):
+            state = state_of(position)
+            value = self.solver.value[position]
+            best_move = self.solver.best_move[position]
+            children = [self.child_value(state, move)
+                        for move in state.get_possible_moves()]
+            if not children:
+                self.assertEqual(value, LOSS)
+            elif value == WIN:
+                self.assertEqual(self.child_value(state, best_move), LOSS)
+            elif value == LOSS:
+                self.assertTrue(all(child == WIN for child in children))
+            else:
+                self.assertNotIn(LOSS, children)
+                self.assertEqual(self.child_value(state, best_move), DRAW)
+
+    def test_distances_are_optimal(self):
+        """
+        Test that a won position is won as fast as possible and a lost one
+        is lost as slowly as possible.
+        """
+        for position in range(POSITIONS):
+            state = state_of(position)
+            value = self.solver.value[position]
+            if value == DRAW or not state.get_possible_moves():
+                continue
+            children = [position_of(state.make_move(move))
+                        for move in state.get_possible_moves()]
+            distances = [self.solver.distance[child] for child in children
+                         if self.solver.value[child] == -value]
+            expected = min(distances) if value == WIN else max(distances)
+            self.assertEqual(self.solver.distance[position], expected + 1)
+
+    def test_swapped_hands_translate_moves(self):
+        """
+        Test that every state, including those with unsorted hands, gets a
+        valid best move of its own which keeps its solved value.
+        """
+        for index in range(5 ** 4 * 2):
+            hands = [index // 125 % 5, index // 25 % 5, index // 5 % 5,
+                     index % 5]
+            state = ChopState(index >= 625, hands[:2], hands[2:])
+            value, _, move = self.solver.solve(state)
+            self.assertEqual(value, self.solver.value[position_of(state)])
+            if move is None:
+                continue
+            self.assertIn(move, state.get_possible_moves())
+            child = state.make_move(move)
+            if value == DRAW:
+                self.assertEqual(self.child_value(state, move), DRAW)
+            else:
+                self.assertEqual(self.child_value(state, move), -value)
+                self.assertEqual(
+                    self.solver.distance[position_of(child)],
+                    self.solver.distance[canonical_of(state)[0]] - 1)
+
+    def test_strategy_wins_won_positions(self):
+        """
+        Test that solved_strategy, playing a won position against itself,
+        wins in exactly the solved number of moves.
+        """
+        game = Chopsticks(True)
+        game.current_state = ChopState(True, [2, 3], [0, 1])
+        self.assertEqual(self.solver.value[position_of(game.current_state)],
+                         WIN)
+        moves = self.solver.distance[position_of(game.current_state)]
+        for _ in range(moves):
+            game.current_state = game.current_state.make_move(
+                solved_strategy(game))
+        self.assertTrue(game.is_winner('p1'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import copy
+import pickle
+import unittest
+from unittest.mock import patch
+
+import state
+from game import SubtractSquare
+from state import ChopState, CompactChopState, CompactSubtractState, \
+    SubtractState, intern_subtract_state
+
+
+def chop_states():
+    """
+    Yield every Chopsticks position, as a ChopState and a CompactChopState.
+    """
+    for is_p1_turn in [True, False]:
+        for hands in range(5 ** 4):
+            p1_state = [hands % 5, hands // 5 % 5]
+            p2_state = [hands // 25 % 5, hands // 125]
+            yield ChopState(is_p1_turn, list(p1_state), list(p2_state)), \
+                CompactChopState(is_p1_turn, p1_state, p2_state)
+
+
+class CompactStateUnitTests(unittest.TestCase):
+    def test_subtract_matches_original(self):
+        """
+        Test that a CompactSubtractState plays like a SubtractState.
+        """
+        for current_val in range(30):
+            for is_p1_turn in [True, False]:
+                state = SubtractState(is_p1_turn, current_val)
+                compact = CompactSubtractState(is_p1_turn, current_val)
+                self.assertEqual(str(compact), str(state))
+                self.assertEqual(compact.get_possible_moves(),
+                                 state.get_possible_moves())
+                for move in state.get_possible_moves() + ['2']:
+                    child = state.make_move(move)
+                    self.assertEqual(
+                        compact.make_move(move),
+                        CompactSubtractState(child.is_p1_turn,
+                                             child.current_val))
+
+    def test_chop_matches_original(self):
+        """
+        Test that a CompactChopState plays like a ChopState.
+        """
+        for state, compact in chop_states():
+            self.assertEqual(str(compact), str(state))
+            self.assertEqual(compact.get_possible_moves(),
+                             state.get_possible_moves())
+            self.assertEqual(list(compact.p1_state), state.p1_state)
+            self.assertEqual(list(compact.p2_state), state.p2_state)
+            for move in state.get_possible_moves():
+                child = state.make_move(move)
+                self.assertEqual(compact.make_move(move),
+                                 CompactChopState(child.is_p1_turn,
+                                                  child.p1_state,
+                                                  child.p2_state))
+
+    def test_hash_agrees_with_eq(self):
+        """
+        Test that equal compact states hash equally, and that states which
+        differ only in whose turn it is are not equal.
+        """
+        states = [compact for _, compact in chop_states()]
+        self.assertEqual(len(set(states)), len(states))
+        self.assertEqual(len(set(states) | {copy.copy(s) for s in states}),
+                         len(states))
+        self.assertNotEqual(CompactSubtractState(True, 8),
+                            CompactSubtractState(False, 8))
+        self.assertEqual(hash(CompactSubtractState(True, 8)),
+                         hash(CompactSubtractState(True, 8)))
+
+    def test_immutable(self):
+        """
+        Test that compact states can neither be changed nor given new
+        attributes, and that they pickle.
+        """
+        for state in [CompactSubtractState(True, 8),
+                      CompactChopState(True, [1, 1], [1, 1])]:
+            self.assertFalse(hasattr(state, '__dict__'))
+            self.assertRaises(AttributeError, setattr, state, 'is_p1_turn',
+                              False)
+            self.assertRaises(AttributeError, setattr, state, 'other', 1)
+            self.assertEqual(pickle.loads(pickle.dumps(state)), state)
+        self.assertRaises(AttributeError, setattr,
+                          CompactChopState(True, [1, 1], [1, 1]), 'p1_left',
+                          2)
+
+    def test_subtract_states_are_interned(self):
+        """
+        Test that make_move hands out one shared state per position, which
+        keeps its moves and survives pickling.
+        """
+        state = CompactSubtractState(True, 20)
+        child = state.make_move('4')
+        self.assertIs(child, intern_subtract_state(False, 16))
+        self.assertIs(child, CompactSubtractState(True, 17).make_move('1'))
+        self.assertIsNot(child, CompactSubtractState(False, 16))
+        self.assertIs(pickle.loads(pickle.dumps(child)), child)
+        moves = child.get_possible_moves()
+        moves.append('2')
+        self.assertEqual(child.get_possible_moves(), ['1', '4', '9', '16'])
+
+    def test_games_share_states(self):
+        """
+        Test that SubtractSquare starts from an interned state, and that the
+        interned states are dropped once there are INTERN_LIMIT of them.
+        """
+        game = SubtractSquare(True, 20)
+        self.assertIs(game.current_state, intern_subtract_state(True, 20))
+        self.assertIs(game.current_state.make_move('4'),
+                      SubtractSquare(False, 16).current_state)
+        with patch.object(state, 'INTERN_LIMIT', 3), \
+                patch.dict(state.INTERNED_SUBTRACT_STATES, clear=True):
+            states = [intern_subtract_state(True, val) for val in range(4)]
+            self.assertEqual(len(state.INTERNED_SUBTRACT_STATES), 1)
+            self.assertIs(intern_subtract_state(True, 3), states[3])
+            self.assertIsNot(intern_subtract_state(True, 0), states[0])
+            self.assertEqual(intern_subtract_state(True, 0), states[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,9 @@
 """
 Code for Game class and its subclass.
 """
-from typing import Any
-from state import State, SubtractState, ChopState
+from typing import Any, Optional
+from state import State, SubtractState, ChopState, CompactChopState, \
+    CompactSubtractState, intern_subtract_state
 
 
 class Game:
@@ -97,20 +98,27 @@ class SubtractSquare(Game):
     is_p1_turn - the turn of p1
     current_val - the current value
     """
-    current_state: SubtractState
+    current_state: CompactSubtractState
     is_p1_turn: bool
     current_val: int
 
-    def __init__(self, is_p1_turn: bool) -> None:
+    def __init__(self, is_p1_turn: bool,
+                 current_val: Optional[int] = None) -> None:
         """
-        Initialzie a new SubtratctSquare game.
+        Initialzie a new SubtratctSquare game starting from current_val, or
+        from a number the user is asked for if current_val is None.
 
         extends Game.__init__(is_p1_turn)
+
+        >>> SubtractSquare(False, 20).current_state == \\
+        ...     CompactSubtractState(False, 20)
+        True
         """
         Game.__init__(self, is_p1_turn)
-        current_val = int(input("Enter a number: "))
+        if current_val is None:
+            current_val = int(input("Enter a number: "))
         self.current_val = current_val
-        self.current_state = SubtractState(is_p1_turn, current_val)
+        self.current_state = intern_subtract_state(is_p1_turn, current_val)
 
     def __str__(self) -> str:
         """
@@ -162,7 +170,7 @@ class Chopsticks(Game):
     p1_state - the state of player 1
     p2_state - the state of player 2
     """
-    current_state: ChopState
+    current_state: CompactChopState
     is_p1_turn: bool
     p1_state: list
     p2_state: list
@@ -176,9 +184,9 @@ class Chopsticks(Game):
         Game.__init__(self, is_p1_turn)
         self.p1_state = [1, 1]
         self.p2_state = [1, 1]
-        self.current_state = ChopState(self.is_p1_turn,
-                                       self.p1_state,
-                                       self.p2_state)
+        self.current_state = CompactChopState(self.is_p1_turn,
+                                              self.p1_state,
+                                              self.p2_state)
 
     def __eq__(self, other: Any) -> bool:
         """
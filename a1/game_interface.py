@@ -1,7 +1,8 @@
 from strategy import *
-from typing import Any, Callable
+from typing import Any, Callable, Optional
 from game import *
 from state import *
+from chopsticks_solver import solved_strategy
 
 # 's' should map to your implementation of Subtract Square, and 'c' should map
 # to Chopsticks.
@@ -12,7 +13,8 @@ playable_games = {'s': SubtractSquare,
 # how to modify this.
 
 usable_strategies = {'r': random_strategy,
-                     'i': interactive_strategy}
+                     'i': interactive_strategy,
+                     'o': solved_strategy}
 
 
 class GameInterface:
@@ -29,18 +31,26 @@ class GameInterface:
     p2_strategy: Callable[[Any], Any]
 
     def __init__(self, game: Any, p1_strategy: Callable,
-                 p2_strategy: Callable[[Any], Any]) -> None:
+                 p2_strategy: Callable[[Any], Any],
+                 p1_starts: Optional[bool] = None) -> None:
         """
         Initialize this GameInterface, setting its active game to game, and
         using the strategies p1_strategy for Player 1 and p2_strategy for
         Player 2.
-        """
-        first_player = input("Type y if player 1 is to make the first move: ")
-        is_p1_turn = False
-        if first_player.lower() == 'y':
-            is_p1_turn = True
 
-        self.game = game(is_p1_turn)
+        game is either a game class, set up with player 1 moving first if
+        p1_starts is True (or if the user says so, if p1_starts is None),
+        or a game which is already set up.
+        """
+        if not isinstance(game, type):
+            self.game = game
+        else:
+            is_p1_turn = p1_starts
+            if is_p1_turn is None:
+                first_player = input(
+                    "Type y if player 1 is to make the first move: ")
+                is_p1_turn = first_player.lower() == 'y'
+            self.game = game(is_p1_turn)
         self.p1_strategy = p1_strategy
         self.p2_strategy = p2_strategy
 
@@ -1,7 +1,43 @@
 """
 Code for State Class and its two subclass.
 """
-from typing import Any, List
+from math import isqrt
+from typing import Any, List, Optional, Sequence, Tuple
+
+# SQUARE_MOVES[k - 1] is the move str(k**2), for every k up to the root of
+# the largest total asked about so far.
+SQUARE_MOVES = []
+
+
+def square_moves(total: int) -> List[str]:
+    """
+    Return the moves for every positive square no greater than total,
+    growing SQUARE_MOVES as needed.
+
+    >>> square_moves(20)
+    ['1', '4', '9', '16']
+    >>> square_moves(0)
+    []
+    """
+    count = isqrt(total) if total > 0 else 0
+    for k in range(len(SQUARE_MOVES) + 1, count + 1):
+        SQUARE_MOVES.append(str(k**2))
+    return SQUARE_MOVES[:count]
+
+
+def square_of(move_to_make: Any) -> int:
+    """
+    Return the positive square move_to_make names, written the way
+    square_moves() writes it, or 0 if it names none.
+
+    >>> [square_of(move) for move in ['9', '8', '09', ' 9', 9, '0']]
+    [9, 0, 0, 0, 0, 0]
+    """
+    if not isinstance(move_to_make, str) or not move_to_make.isascii() or \
+            not move_to_make.isdigit() or move_to_make[0] == '0':
+        return 0
+    square = int(move_to_make)
+    return square if isqrt(square)**2 == square else 0
 
 
 class State:
@@ -84,6 +120,9 @@ class SubtractState(State):
     """
     A class of the state of a SubtrractSquare game.
 
+    SubtractSquare plays on CompactSubtractState; this mutable version is
+    what it is checked against.
+
     is_p1_turn - the turn of p1
     current_val - the current value
     """
@@ -141,8 +180,20 @@ class SubtractState(State):
         >>> square.get_possible_moves()
         ['1', '4', '9', '16']
         """
-        return [str(i**2) for i in range(1, self.current_val + 1)
-                if i**2 <= self.current_val]
+        return square_moves(self.current_val)
+
+    def is_valid_move(self, move_to_make: str) -> bool:
+        """
+        Return whether move_to_make is a a valid move, without listing
+        the possible moves.
+
+        over-rides State.is_valid_move(move_to_make)
+
+        >>> square = SubtractState(True,20)
+        >>> [square.is_valid_move(move) for move in ['16', '25', '2', None]]
+        [True, False, False, False]
+        """
+        return 0 < square_of(move_to_make) <= self.current_val
 
     def make_move(self, move_to_make: str) -> "SubtractState":
         """
@@ -179,6 +230,9 @@ class ChopState(State):
     """
     A class of the state of a Chopsticks game.
 
+    Chopsticks plays on CompactChopState; this mutable version is what it
+    is checked against.
+
     is_p1_turn - the turn of p1
     p1_state - the state of player 1
     p2_state - the state of player 2
@@ -325,6 +379,296 @@ class ChopState(State):
         return ChopState(is_p1_turn, p1_state, p2_state)
 
 
+class CompactSubtractState:
+    """
+    An immutable state of a SubtractSquare game, which keeps its fields in
+    __slots__ rather than a __dict__ so that searches creating many of them
+    use less memory. It can be hashed, and equal states hash equally.
+
+    States got from intern_subtract_state(), and so every state make_move
+    returns, are shared: there is one per (is_p1_turn, current_val), which
+    keeps its possible moves once they are worked out.
+
+    It does not inherit from State, since a class only drops its __dict__
+    if every class it inherits from declares __slots__ too.
+
+    is_p1_turn - the turn of p1
+    current_val - the current value
+    moves - the possible moves, or None until they are first asked for
+    """
+
+    __slots__ = ('is_p1_turn', 'current_val', 'moves')
+    is_p1_turn: bool
+    current_val: int
+    moves: Optional[Tuple[str, ...]]
+
+    get_current_player_name = State.get_current_player_name
+    is_valid_move = SubtractState.is_valid_move
+
+    def __init__(self, is_p1_turn: bool, current_val: int) -> None:
+        """
+        Initialize a new state of SubtractSquare game.
+        """
+        object.__setattr__(self, 'is_p1_turn', is_p1_turn)
+        object.__setattr__(self, 'current_val', current_val)
+        object.__setattr__(self, 'moves', None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Refuse to change self.
+
+        >>> CompactSubtractState(True, 8).current_val = 7
+        Traceback (most recent call last):
+        ...
+        AttributeError: CompactSubtractState is immutable
+        """
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __reduce__(self) -> tuple:
+        """
+        Return how to rebuild self, for pickle and copy.
+        """
+        return intern_subtract_state, (self.is_p1_turn, self.current_val)
+
+    def __str__(self) -> str:
+        """
+        Return an informative string about self which contains \
+        the current player and the current value.
+
+        >>> CompactSubtractState(True,8).__str__()
+        'The current player is p1 and the current value is 8.'
+        """
+        return "The current player is {} and the current value is {}.".format(
+            self.get_current_player_name(), self.current_val)
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether self is equivalent to other.
+
+        >>> CompactSubtractState(True,8) == CompactSubtractState(False,8)
+        False
+        >>> CompactSubtractState(True,8) == CompactSubtractState(True,8)
+        True
+        """
+        return (type(self) == type(other)
+                and self.current_val == other.current_val
+                and self.is_p1_turn == other.is_p1_turn)
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of self which agrees with __eq__.
+        """
+        return hash((self.is_p1_turn, self.current_val))
+
+    def get_possible_moves(self) -> List[str]:
+        """
+        Return a list of str which contains the possible moves.
+
+        >>> CompactSubtractState(True,8).get_possible_moves()
+        ['1', '4']
+        """
+        if self.moves is None:
+            object.__setattr__(self, 'moves',
+                               tuple(square_moves(self.current_val)))
+        return list(self.moves)
+
+    def make_move(self, move_to_make: str) -> "CompactSubtractState":
+        """
+        Return the state after making a move move_to_make, or self if
+        move_to_make is not valid.
+
+        >>> square = CompactSubtractState(True,8)
+        >>> square.make_move('4') == CompactSubtractState(False, 4)
+        True
+        >>> square.make_move('8') is square
+        True
+        """
+        if not self.is_valid_move(move_to_make):
+            return self
+        return intern_subtract_state(not self.is_p1_turn,
+                                     self.current_val - int(move_to_make))
+
+
+# The shared state of every (is_p1_turn, current_val) interned so far. It is
+# emptied whenever it reaches INTERN_LIMIT states, and can be emptied with
+# INTERNED_SUBTRACT_STATES.clear() at any time: states handed out before
+# that still work, but are no longer shared with the ones handed out after.
+INTERNED_SUBTRACT_STATES = {}
+INTERN_LIMIT = 2 ** 18
+
+
+def intern_subtract_state(is_p1_turn: bool,
+                          current_val: int) -> CompactSubtractState:
+    """
+    Return the shared CompactSubtractState with is_p1_turn and current_val,
+    creating it the first time it is asked for.
+
+    >>> state = intern_subtract_state(True, 8).make_move('4')
+    >>> state is intern_subtract_state(False, 4)
+    True
+    """
+    key = (is_p1_turn, current_val)
+    state = INTERNED_SUBTRACT_STATES.get(key)
+    if state is None:
+        if len(INTERNED_SUBTRACT_STATES) >= INTERN_LIMIT:
+            INTERNED_SUBTRACT_STATES.clear()
+        state = CompactSubtractState(is_p1_turn, current_val)
+        INTERNED_SUBTRACT_STATES[key] = state
+    return state
+
+
+class CompactChopState:
+    """
+    An immutable state of a Chopsticks game, which keeps its fields in
+    __slots__ rather than a __dict__, and keeps each hand once rather than
+    both in a list and on its own. It can be hashed, and equal states hash
+    equally.
+
+    is_p1_turn - the turn of p1
+    hands - the left and right hands of player 1, then those of player 2
+    """
+
+    __slots__ = ('is_p1_turn', 'hands')
+    is_p1_turn: bool
+    hands: Tuple[int, int, int, int]
+
+    get_current_player_name = State.get_current_player_name
+    is_valid_move = State.is_valid_move
+
+    def __init__(self, is_p1_turn: bool, p1_state: Sequence[int],
+                 p2_state: Sequence[int]) -> None:
+        """
+        Initialize a new state of Chopsticks game.
+        """
+        object.__setattr__(self, 'is_p1_turn', is_p1_turn)
+        object.__setattr__(self, 'hands', (p1_state[0], p1_state[1],
+                                           p2_state[0], p2_state[1]))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Refuse to change self.
+        """
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __reduce__(self) -> tuple:
+        """
+        Return how to rebuild self, for pickle and copy.
+        """
+        return CompactChopState, (self.is_p1_turn, self.hands[:2],
+                                  self.hands[2:])
+
+    @property
+    def p1_state(self) -> Tuple[int, ...]:
+        """
+        Return the hands of player 1.
+        """
+        return self.hands[:2]
+
+    @property
+    def p2_state(self) -> Tuple[int, ...]:
+        """
+        Return the hands of player 2.
+        """
+        return self.hands[2:]
+
+    @property
+    def p1_left(self) -> int:
+        """
+        Return the left hand of player 1.
+        """
+        return self.hands[0]
+
+    @property
+    def p1_right(self) -> int:
+        """
+        Return the right hand of player 1.
+        """
+        return self.hands[1]
+
+    @property
+    def p2_left(self) -> int:
+        """
+        Return the left hand of player 2.
+        """
+        return self.hands[2]
+
+    @property
+    def p2_right(self) -> int:
+        """
+        Return the right hand of player 2.
+        """
+        return self.hands[3]
+
+    def __str__(self) -> str:
+        """
+        Return an informative string about self which includes \
+        the name of current player and the current states\
+        of player 1 and player 2.
+
+        >>> CompactChopState(True, [1,1], [2,3]).__str__()
+        'Player 1: 1-1; Player 2: 2-3, the current player is p1.'
+        """
+        return "Player 1: {}-{}; Player 2: {}-{}, the current player is {}."\
+            .format(self.hands[0], self.hands[1], self.hands[2],
+                    self.hands[3], self.get_current_player_name())
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether self is equivalent to other, including whose turn
+        it is.
+
+        >>> chop = CompactChopState(True, [1,1], [2,3])
+        >>> chop == CompactChopState(True, (1,1), (2,3))
+        True
+        >>> chop == CompactChopState(False, [1,1], [2,3])
+        False
+        """
+        return (type(self) == type(other)
+                and self.is_p1_turn == other.is_p1_turn
+                and self.hands == other.hands)
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of self which agrees with __eq__.
+        """
+        return hash((self.is_p1_turn, self.hands))
+
+    def get_possible_moves(self) -> List[str]:
+        """
+        Return a list of str which contains the possible moves.
+
+        >>> CompactChopState(True, [1,0], [1,2]).get_possible_moves()
+        ['ll', 'lr']
+        >>> CompactChopState(False, [1,4], [0,2]).get_possible_moves()
+        ['rl', 'rr']
+        """
+        mover, target = (self.hands[:2], self.hands[2:]) if self.is_p1_turn \
+            else (self.hands[2:], self.hands[:2])
+        return [mine + theirs
+                for mine, hand in zip('lr', mover) if hand != 0
+                for theirs, other in zip('lr', target) if other != 0]
+
+    def make_move(self, move_to_make: str) -> "CompactChopState":
+        """
+        Return the state after making a move move_to_make, or self if
+        move_to_make is not valid.
+
+        >>> chop = CompactChopState(True, [1,0], [1,2])
+        >>> chop.make_move('ll') == CompactChopState(False, [1,0], [2,2])
+        True
+        >>> chop.make_move('rl') is chop
+        True
+        """
+        if not self.is_valid_move(move_to_make):
+            return self
+        hands = list(self.hands)
+        mover, target = (0, 2) if self.is_p1_turn else (2, 0)
+        source = mover + 'lr'.index(move_to_make[0])
+        hit = target + 'lr'.index(move_to_make[1])
+        hands[hit] = (hands[hit] + hands[source]) % 5
+        return CompactChopState(not self.is_p1_turn, hands[:2], hands[2:])
+
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
@@ -4,7 +4,8 @@ from unittest.mock import patch
 import re
 
 # Import the student solution
-from game_interface import playable_games
+from game_interface import GameInterface, playable_games
+from strategy import interactive_strategy
 SubtractSquareGame = playable_games['s']
 SUBTRACT_SQUARE_FORMAT = ".*(?<=[^0-9])([0-9]+)"
 
@@ -337,6 +338,42 @@ class SubtractSquareUnitTests(unittest.TestCase):
                           "Square with a value of 20) should return a move " +
                           "that is of the same type as a valid move."))
 
+    def test_moves_match_definition(self):
+        """
+        Test that get_possible_moves() lists exactly the squares no greater
+        than the current value, and that is_valid_move() accepts exactly
+        those, for small values and around a large one.
+        """
+        values = list(range(50)) + list(range(10 ** 8 - 3, 10 ** 8 + 3))
+        for value in values:
+            with patch('builtins.input', return_value=str(value)):
+                state = SubtractSquareGame(True).current_state
+            expected = [str(i * i) for i in range(1, 10 ** 4 + 2)
+                        if i * i <= value]
+            self.assertEqual(state.get_possible_moves(), expected)
+            for move in expected[-3:] + [str(value), str(value + 1), '0',
+                                         '-1', '01', ' 1', 'x', None]:
+                self.assertEqual(state.is_valid_move(move), move in expected)
+
+    @patch('builtins.input', side_effect=AssertionError("asked for input"))
+    def test_init_without_input(self, input):
+        """
+        Test that SubtractSquare and GameInterface ask nothing when they are
+        given the starting value and first player, or a game already set
+        up.
+        """
+        game = SubtractSquareGame(False, 20)
+        self.assertEqual(self.extract_subtract_square_value(
+            game.current_state), 20)
+        self.assertEqual(game.current_state.get_current_player_name(), 'p2')
+        interface = GameInterface(playable_games['c'], interactive_strategy,
+                                  interactive_strategy, p1_starts=True)
+        self.assertEqual(
+            interface.game.current_state.get_current_player_name(), 'p1')
+        interface = GameInterface(game, interactive_strategy,
+                                  interactive_strategy)
+        self.assertIs(interface.game, game)
+
 if __name__ == "__main__":
     unittest.main()
 
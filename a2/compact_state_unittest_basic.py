@@ -0,0 +1,207 @@
+"""
+Unittests for CompactSubtractSquareState.
+
+It is checked against SubtractSquareState, which it should play exactly
+like, and against the minimax strategies, which should treat it the same.
+"""
+
+import pickle
+import unittest
+from math import isqrt
+from unittest.mock import patch
+
+import strategy
+import subtract_square_state
+from game_state import GameState
+from subtract_square_game import SubtractSquareGame
+from subtract_square_solver import SubtractSquareSolver, solved_strategy
+from subtract_square_state import CompactSubtractSquareState, \
+    SubtractSquareState, intern_state
+
+
+class CompactSubtractSquareStateUnitTests(unittest.TestCase):
+    def test_matches_original(self):
+        """
+        Test that a CompactSubtractSquareState renders, moves and estimates
+        like a SubtractSquareState.
+        """
+        for total in range(40):
+            for p1_turn in [True, False]:
+                state = SubtractSquareState(p1_turn, total)
+                compact = CompactSubtractSquareState(p1_turn, total)
+                self.assertEqual(str(compact), str(state))
+                self.assertEqual(repr(compact), repr(state))
+                self.assertEqual(compact.get_possible_moves(),
+                                 state.get_possible_moves())
+                self.assertEqual(compact.rough_outcome(),
+                                 state.rough_outcome())
+                for move in state.get_possible_moves():
+                    self.assertEqual(repr(compact.make_move(move)),
+                                     repr(state.make_move(move)))
+                    self.assertEqual(compact.make_move(str(move)),
+                                     compact.make_move(move))
+
+    def test_moves_match_definition(self):
+        """
+        Test that both states list exactly the squares no greater than the
+        total, and accept exactly those as valid, for small totals and
+        around a large one.
+        """
+        totals = list(range(50)) + list(range(10 ** 8 - 3, 10 ** 8 + 3))
+        for total in totals:
+            expected = [i * i for i in range(1, 10 ** 4 + 2) if i * i <= total]
+            for state in [SubtractSquareState(True, total),
+                          CompactSubtractSquareState(True, total)]:
+                self.assertEqual(state.get_possible_moves(), expected)
+                for move in expected[-3:] + [total, total + 1, 0, -1, '1',
+                                             None]:
+                    self.assertEqual(state.is_valid_move(move),
+                                     move in expected)
+
+    def test_rough_outcome_matches_definition(self):
+        """
+        Test that rough_outcome is WIN on squares, LOSE when every move
+        leaves a square, and DRAW otherwise, with and without its cache.
+        """
+        totals = list(range(200)) + [10 ** 16, 10 ** 16 + 1, 2 ** 60 + 1]
+        for cache in [None, {}, {}]:
+            with patch.object(subtract_square_state, 'ROUGH_OUTCOME_CACHE',
+                              cache):
+                for total in totals:
+                    root = isqrt(total)
+                    if total > 0 and root * root == total:
+                        expected = GameState.WIN
+                    elif all(isqrt(total - k * k) ** 2 == total - k * k
+                             for k in range(1, root + 1)):
+                        expected = GameState.LOSE
+                    else:
+                        expected = GameState.DRAW
+                    for state in [SubtractSquareState(True, total),
+                                  CompactSubtractSquareState(True, total)]:
+                        self.assertEqual(state.rough_outcome(), expected)
+            if cache is not None:
+                self.assertEqual(len(cache), len(totals))
+
+    def test_child_rough_outcomes(self):
+        """
+        Test that scoring all children together agrees with scoring each
+        one, with NumPy, without it, and past the totals NumPy can hold.
+        """
+        totals = list(range(300)) + [10 ** 6 + 1, 123456789]
+        for np, limit in [(subtract_square_state.np, 2 ** 62),
+                          (None, 2 ** 62),
+                          (subtract_square_state.np, 100)]:
+            with patch.object(subtract_square_state, 'np', np), \
+                    patch.object(subtract_square_state, 'NUMPY_LIMIT',
+                                 limit):
+                for total in totals:
+                    for state in [SubtractSquareState(True, total),
+                                  CompactSubtractSquareState(True, total)]:
+                        self.assertEqual(
+                            state.child_rough_outcomes(),
+                            GameState.child_rough_outcomes(state))
+
+    def test_rough_outcome_strategy_uses_batch(self):
+        """
+        Test that rough_outcome_strategy picks the same moves from the
+        batched outcomes as from scoring each child.
+        """
+        for total in list(range(1, 60)) + [10 ** 5 + 3]:
+            game = SubtractSquareGame(True, total)
+            expected = strategy.rough_outcome_strategy(game)
+            with patch.object(SubtractSquareState, 'child_rough_outcomes',
+                              GameState.child_rough_outcomes):
+                self.assertEqual(strategy.rough_outcome_strategy(game),
+                                 expected)
+
+    def test_hash_agrees_with_eq(self):
+        """
+        Test that equal states hash equally and unequal ones are told apart.
+        """
+        states = [CompactSubtractSquareState(p1_turn, total)
+                  for p1_turn in [True, False] for total in range(100)]
+        copies = [CompactSubtractSquareState(state.p1_turn,
+                                             state.current_total)
+                  for state in states]
+        self.assertEqual(len(set(states + copies)), len(states))
+        for state, copy in zip(states, copies):
+            self.assertEqual(hash(state), hash(copy))
+        self.assertNotEqual(CompactSubtractSquareState(True, 5),
+                            SubtractSquareState(True, 5))
+
+    def test_immutable(self):
+        """
+        Test that a state can neither be changed nor given new attributes,
+        and that it pickles.
+        """
+        state = CompactSubtractSquareState(True, 10)
+        self.assertFalse(hasattr(state, '__dict__'))
+        self.assertRaises(AttributeError, setattr, state, 'current_total', 1)
+        self.assertRaises(AttributeError, setattr, state, 'other', 1)
+        self.assertEqual(pickle.loads(pickle.dumps(state)), state)
+
+    def test_minimax_agrees(self):
+        """
+        Test that the minimax strategies pick the same moves from a compact
+        state as from the original.
+        """
+        for total in [4, 10, 18, 30]:
+            game = SubtractSquareGame(True, total)
+            strategy.TRANSPOSITION_TABLE.clear()
+            expected = strategy.iterative_minimax(game)
+            game.current_state = CompactSubtractSquareState(True, total)
+            for minimax in [strategy.recursive_minimax,
+                            strategy.iterative_minimax]:
+                strategy.TRANSPOSITION_TABLE.clear()
+                self.assertEqual(minimax(game), expected)
+        strategy.TRANSPOSITION_TABLE.clear()
+
+    def test_interned(self):
+        """
+        Test that make_move hands out one shared state per position, which
+        keeps its moves and survives pickling.
+        """
+        child = CompactSubtractSquareState(True, 20).make_move(4)
+        self.assertIs(child, intern_state(False, 16))
+        self.assertIs(child, CompactSubtractSquareState(True, 17).make_move(1))
+        self.assertIsNot(child, CompactSubtractSquareState(False, 16))
+        self.assertIs(pickle.loads(pickle.dumps(child)), child)
+        moves = child.get_possible_moves()
+        moves.append(2)
+        self.assertEqual(child.get_possible_moves(), [1, 4, 9, 16])
+
+    def test_solved_value(self):
+        """
+        Test that solved_value agrees with a fresh solver, and is kept on
+        the state.
+        """
+        solver = SubtractSquareSolver(200)
+        for total in range(200):
+            state = intern_state(total % 2 == 0, total)
+            expected = state.WIN if solver.is_win(total) else state.LOSE
+            self.assertEqual(state.solved_value(), expected)
+            self.assertEqual(state.value, expected)
+
+    def test_games_share_states(self):
+        """
+        Test that games start from interned states, so searches from them
+        share every state, and that the interned states are dropped once
+        there are INTERN_LIMIT of them.
+        """
+        game = SubtractSquareGame(True, 20)
+        self.assertIs(game.current_state, intern_state(True, 20))
+        self.assertIs(game.current_state.make_move(4),
+                      SubtractSquareGame(False, 16).current_state)
+        self.assertEqual(solved_strategy(game), 1)
+        self.assertEqual(game.current_state.value, GameState.LOSE)
+        with patch.object(subtract_square_state, 'INTERN_LIMIT', 3), \
+                patch.dict(subtract_square_state.INTERNED_STATES, clear=True):
+            states = [intern_state(True, total) for total in range(4)]
+            self.assertEqual(len(subtract_square_state.INTERNED_STATES), 1)
+            self.assertIs(intern_state(True, 3), states[3])
+            self.assertIsNot(intern_state(True, 0), states[0])
+            self.assertEqual(intern_state(True, 0), states[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -36,6 +36,23 @@ class Game:
         """
         raise NotImplementedError
 
+    def is_winner_at(self, state: GameState, player: str) -> bool:
+        """
+        Return whether player has won the game at state, without changing
+        this game's current state.
+
+        Games should override this with a check on state alone; this
+        default briefly swaps state in so any is_winner() keeps working.
+
+        Precondition: player is 'p1' or 'p2'.
+        """
+        current_state = self.current_state
+        self.current_state = state
+        try:
+            return self.is_winner(player)
+        finally:
+            self.current_state = current_state
+
     def str_to_move(self, string: str) -> Any:
         """
         Return the move that string represents. If string is not a move,
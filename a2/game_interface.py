@@ -10,7 +10,8 @@ your own curiousity!)
 """
 # TODO: import the modules needed to make game_interface run.
 from strategy import *
-from typing import Any, Callable
+from mcts import mcts_strategy
+from typing import Any, Callable, Optional
 from stonehenge import *
 from subtract_square_game import SubtractSquareGame
 
@@ -24,8 +25,11 @@ playable_games = {'s': SubtractSquareGame,
 # 'mi' should map to your iterative implementation of minimax
 usable_strategies = {'i': interactive_strategy,
                      'ro': rough_outcome_strategy,
-                     'mr': recursive_minimax,
-                     'mi': iterative_minimax}
+                     'mr': recursive_alphabeta,
+                     'mi': iterative_alphabeta,
+                     'id': iterative_deepening,
+                     'mp': parallel_minimax,
+                     'mc': mcts_strategy}
 
 
 class GameInterface:
@@ -35,25 +39,33 @@ class GameInterface:
     """
 
     def __init__(self, game: Any, p1_strategy: Callable,
-                 p2_strategy: Callable[[Any], Any]) -> None:
+                 p2_strategy: Callable[[Any], Any],
+                 p1_starts: Optional[bool] = None) -> None:
         """
         Initialize this GameInterface, setting its active game to game, and
         using the strategies p1_strategy for Player 1 and p2_strategy for
         Player 2.
 
-        :param game: The game to be played.
+        :param game: The game to be played: a game class, or a game which
+                     is already set up.
         :type game:
         :param p1_strategy: The strategy for Player 1.
         :type p1_strategy:
         :param p2_strategy: The strategy for Play 2.
         :type p2_strategy:
+        :param p1_starts: Whether Player 1 moves first in a game set up from
+                          a game class, or None to ask the user.
+        :type p1_starts: bool
         """
-        first_player = input("Type y if player 1 is to make the first move: ")
-        is_p1_turn = False
-        if first_player.lower() == 'y':
-            is_p1_turn = True
-
-        self.game = game(is_p1_turn)
+        if not isinstance(game, type):
+            self.game = game
+        else:
+            is_p1_turn = p1_starts
+            if is_p1_turn is None:
+                first_player = input(
+                    "Type y if player 1 is to make the first move: ")
+                is_p1_turn = first_player.lower() == 'y'
+            self.game = game(is_p1_turn)
         self.p1_strategy = p1_strategy
         self.p2_strategy = p2_strategy
 
@@ -15,6 +15,8 @@ class GameState:
     DRAW - score if player is in a tied position
     p1_turn - whether it is p1's turn or not
     """
+    # Empty, so that subclasses which declare __slots__ have no __dict__.
+    __slots__ = ()
     WIN: int = 1
     LOSE: int = -1
     DRAW: int = 0
@@ -75,6 +77,17 @@ class GameState:
         """
         raise NotImplementedError
 
+    def child_rough_outcomes(self) -> list:
+        """
+        Return the rough_outcome() of the state each possible move leads
+        to, in the order of get_possible_moves().
+
+        Games whose children share work can override this to score them
+        all at once.
+        """
+        return [self.make_move(move).rough_outcome()
+                for move in self.get_possible_moves()]
+
 
 if __name__ == "__main__":
     from python_ta import check_all
@@ -0,0 +1,176 @@
+"""
+A Monte Carlo Tree Search (UCT) strategy.
+
+Instead of searching every move to the end, this plays many random games
+from the current state and spends more of them on the moves that have won
+most often so far. It only needs get_possible_moves() and make_move(), so
+it plays any game, including ones too big for minimax.
+
+NOTE: You do not have to run python-ta on this file.
+"""
+import math
+import random
+import time
+from typing import Any, List, Optional
+from game import Game
+from game_state import GameState
+
+
+class MCTSNode:
+    """
+    A state in the tree grown by MCTSStrategy.
+
+    state - the state
+    move - the move which led to this state, or None for the root
+    parent - the node this state was reached from, or None for the root
+    children - the nodes of the moves tried from this state so far
+    untried - the moves from this state which have no node yet
+    visits - the number of random games played through this node
+    wins - how many of those games the player who made move won, with
+           draws counting as half
+    """
+    state: GameState
+    move: Any
+    parent: Optional['MCTSNode']
+    children: List['MCTSNode']
+    untried: List[Any]
+    visits: int
+    wins: float
+
+    def __init__(self, game: Game, state: GameState, move: Any = None,
+                 parent: 'MCTSNode' = None) -> None:
+        """
+        Create MCTSNode self for state in game, reached by move from parent.
+        """
+        self.state = state
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = [] if game.is_over(state) \
+            else list(state.get_possible_moves())
+        self.visits = 0
+        self.wins = 0.0
+
+    def select_child(self, exploration: float) -> 'MCTSNode':
+        """
+        Return the child with the highest upper confidence bound.
+
+        Precondition: every child has been visited at least once.
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children,
+                   key=lambda child: child.wins / child.visits +
+                   exploration * math.sqrt(log_visits / child.visits))
+
+    def find(self, state: GameState) -> Optional['MCTSNode']:
+        """
+        Return this node or the child of it whose state equals state, or
+        None if there is neither.
+        """
+        if repr(self.state) == repr(state):
+            return self
+        for child in self.children:
+            if repr(child.state) == repr(state):
+                return child
+        return None
+
+
+class MCTSStrategy:
+    """
+    A strategy which picks moves by Monte Carlo Tree Search.
+
+    Each call searches until playouts random games have been played or
+    time_limit seconds have passed, whichever comes first (either may be
+    None), but always plays at least one, so there is a move to pick. The
+    tree below the chosen move is kept, so the next call starts
+    from what was already learned about the opponent's replies.
+
+    playouts - the number of random games to play per move, or None
+    time_limit - the number of seconds to search per move, or None
+    exploration - how much to favour rarely tried moves over good ones
+    rng - the random number generator used for the random games
+    root - the node of the chosen move from the last call, or None
+    """
+    playouts: Optional[int]
+    time_limit: Optional[float]
+    exploration: float
+    rng: random.Random
+    root: Optional[MCTSNode]
+
+    def __init__(self, playouts: Optional[int] = 1000,
+                 time_limit: Optional[float] = None,
+                 exploration: float = math.sqrt(2),
+                 seed: Any = None) -> None:
+        """
+        Initialize a new MCTSStrategy.
+
+        Precondition: playouts and time_limit are not both None.
+        """
+        self.playouts = playouts
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+
+    def __call__(self, game: Game) -> Any:
+        """
+        Return a move for the current player of game.
+        """
+        root = self.root.find(game.current_state) if self.root else None
+        if root is None:
+            root = MCTSNode(game, game.current_state)
+        root.parent = None
+        deadline = None
+        if self.time_limit is not None:
+            deadline = time.perf_counter() + self.time_limit
+        self.playout(game, root)
+        played = 1
+        while (self.playouts is None or played < self.playouts) and \
+                (deadline is None or time.perf_counter() < deadline):
+            self.playout(game, root)
+            played += 1
+        best = max(root.children, key=lambda child: child.visits)
+        self.root = best
+        return best.move
+
+    def playout(self, game: Game, root: MCTSNode) -> None:
+        """
+        Play one random game from root, growing the tree by one node and
+        recording the result in every node on the way.
+        """
+        node = root
+        while not node.untried and node.children:
+            node = node.select_child(self.exploration)
+        if node.untried:
+            move = node.untried.pop(self.rng.randrange(len(node.untried)))
+            child = MCTSNode(game, node.state.make_move(move), move, node)
+            node.children.append(child)
+            node = child
+        state = node.state
+        while not game.is_over(state):
+            state = state.make_move(self.rng.choice(
+                state.get_possible_moves()))
+        winner = None
+        for player in ['p1', 'p2']:
+            if game.is_winner_at(state, player):
+                winner = player
+        while node.parent is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.parent.state.get_current_player_name():
+                node.wins += 1
+            node = node.parent
+        node.visits += 1
+
+
+# The MCTSStrategy behind mcts_strategy, shared by both players so either
+# one's tree is reused by the other.
+MCTS = MCTSStrategy()
+
+
+def mcts_strategy(game: Game) -> Any:
+    """
+    Return a move for game picked by Monte Carlo Tree Search.
+    """
+    return MCTS(game)
@@ -0,0 +1,103 @@
+"""
+Compare how many positions each minimax search generates, and how long it
+takes, on the positions used by minimax_unittest_basic.py (SubtractSquare
+from 4 and 18, and the side-3 and side-2 Stonehenge boards it plays into)
+plus a few larger SubtractSquare totals.
+
+Run it from this directory:  python minimax_benchmark.py
+
+NOTE: You do not have to run python-ta on this file.
+"""
+import time
+from typing import Any, Callable, List
+from unittest.mock import patch
+
+import strategy
+from stonehenge import StonehengeGame, StonehengeState
+from subtract_square_game import SubtractSquareGame
+from subtract_square_state import SubtractSquareState
+
+SUBTRACT_SQUARE_TOTALS = [4, 18, 50, 100, 200]
+
+# [name, p1 starts, side length, moves played before searching] of each
+# Stonehenge board of minimax_unittest_basic.py.
+STONEHENGE_BOARDS = [
+    ['stonehenge 3', False, 3, ['K', 'A', 'C', 'B', 'F', 'E', 'G', 'D', 'I']],
+    ['stonehenge 2', True, 2, ['A', 'F', 'D']]]
+
+SEARCHES = [('score', strategy.score),
+            ('tree_score', strategy.tree_score),
+            ('alphabeta_score', strategy.alphabeta_score),
+            ('alphabeta_tree_score', strategy.alphabeta_tree_score)]
+
+
+def count_nodes(state_class: Any, search: Callable, game: Any) -> List[float]:
+    """
+    Return [nodes generated, seconds taken] for search on game, starting
+    with an empty transposition table.
+
+    A node is counted every time the search calls make_move on a
+    state_class, i.e. for every child position it creates.
+    """
+    calls = [0]
+    make_move = state_class.make_move
+
+    def counting_make_move(self: Any, move: Any) -> Any:
+        """
+        Count this call, then defer to the real make_move.
+        """
+        calls[0] += 1
+        return make_move(self, move)
+
+    strategy.TRANSPOSITION_TABLE.clear()
+    with patch.object(state_class, 'make_move', counting_make_move):
+        start = time.perf_counter()
+        search(game)
+        elapsed = time.perf_counter() - start
+    return [calls[0], elapsed]
+
+
+def subtract_square_game(total: int) -> SubtractSquareGame:
+    """
+    Return a new SubtractSquareGame starting from total, on a
+    SubtractSquareState so that count_nodes sees its moves.
+    """
+    game = SubtractSquareGame(True, total)
+    game.current_state = SubtractSquareState(True, total)
+    return game
+
+
+def stonehenge_game(p1_starts: bool, side_length: int,
+                    moves: List[str]) -> StonehengeGame:
+    """
+    Return a new StonehengeGame with side_length after moves are played.
+    """
+    game = StonehengeGame(p1_starts, side_length)
+    for move in moves:
+        game.current_state = game.current_state.make_move(move)
+    return game
+
+
+def main() -> None:
+    """
+    Print a table of nodes generated and time taken by every search.
+    """
+    print("{:<22}{:>22}{:>10}{:>12}".format('position', 'search', 'nodes',
+                                           'seconds'))
+    for total in SUBTRACT_SQUARE_TOTALS:
+        for name, search in SEARCHES:
+            nodes, elapsed = count_nodes(SubtractSquareState, search,
+                                         subtract_square_game(total))
+            print("{:<22}{:>22}{:>10}{:>12.4f}".format(
+                'subtract square {}'.format(total), name, nodes, elapsed))
+    for board, p1_starts, side_length, moves in STONEHENGE_BOARDS:
+        for name, search in SEARCHES:
+            nodes, elapsed = count_nodes(
+                StonehengeState, search,
+                stonehenge_game(p1_starts, side_length, moves))
+            print("{:<22}{:>22}{:>10}{:>12.4f}".format(board, name, nodes,
+                                                      elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compare the wall-clock time parallel_minimax takes to pick a move with
+different numbers of worker processes, against iterative_alphabeta on one
+core, to check how its speedup grows with the cores it is given.
+
+Run it from this directory:  python parallel_minimax_benchmark.py [workers ...]
+
+The endgame tablebases are switched off, so Stonehenge positions are
+searched like any other. Every run starts with empty transposition tables
+and a new pool, whose start-up is counted.
+
+NOTE: You do not have to run python-ta on this file.
+"""
+import os
+import sys
+import time
+from typing import Any, Callable, List
+from unittest.mock import patch
+
+import strategy
+from stonehenge import StonehengeGame
+from subtract_square_game import SubtractSquareGame
+
+POSITIONS = [('subtract square 1000', lambda: SubtractSquareGame(True, 1000)),
+             ('subtract square 3000', lambda: SubtractSquareGame(True, 3000)),
+             ('stonehenge 3', lambda: StonehengeGame(True, 3))]
+
+
+def default_workers() -> List[int]:
+    """
+    Return 1, 2, 4, ... up to the number of CPUs, and that number.
+    """
+    cpus = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 < cpus:
+        workers.append(workers[-1] * 2)
+    return workers + [cpus] if cpus > 1 else workers
+
+
+def time_move(search: Callable, make_game: Callable, workers: Any) -> float:
+    """
+    Return the seconds search takes to pick a move in the game make_game
+    returns, with a pool of workers processes and nothing remembered from
+    earlier searches.
+    """
+    strategy.TRANSPOSITION_TABLE.clear()
+    strategy.shutdown_pool()
+    game = make_game()
+    with patch.object(strategy, 'tablebase_move', lambda state: None), \
+            patch.object(strategy, 'WORKERS', workers):
+        start = time.perf_counter()
+        search(game)
+        elapsed = time.perf_counter() - start
+        strategy.shutdown_pool()
+    return elapsed
+
+
+def main(worker_counts: List[int]) -> None:
+    """
+    Print a table of seconds taken on each position by iterative_alphabeta,
+    and by parallel_minimax with each number of workers in worker_counts,
+    with the speedup over iterative_alphabeta.
+    """
+    print("{:<22}{:>10}{:>12}{:>10}".format('position', 'workers',
+                                            'seconds', 'speedup'))
+    for name, make_game in POSITIONS:
+        sequential = time_move(strategy.iterative_alphabeta, make_game, None)
+        print("{:<22}{:>10}{:>12.3f}{:>10.2f}".format(name, 'sequential',
+                                                      sequential, 1.0))
+        for workers in worker_counts:
+            elapsed = time_move(strategy.parallel_minimax, make_game, workers)
+            print("{:<22}{:>10}{:>12.3f}{:>10.2f}".format(
+                name, workers, elapsed, sequential / elapsed))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or default_workers())
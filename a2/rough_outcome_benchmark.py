@@ -0,0 +1,104 @@
+"""
+Compare how long SubtractSquareState.rough_outcome, and one move of
+rough_outcome_strategy, take before and after it was rewritten around
+math.isqrt, with and without its cache, and with the children scored one
+at a time or all together by child_rough_outcomes.
+
+Run it from this directory:  python rough_outcome_benchmark.py [total ...]
+
+NOTE: You do not have to run python-ta on this file.
+"""
+import sys
+import time
+from typing import Any, Callable, List
+from unittest.mock import patch
+
+import strategy
+import subtract_square_state
+from game_state import GameState
+from subtract_square_game import SubtractSquareGame
+from subtract_square_state import SubtractSquareState, is_pos_square
+
+# One past each power of 10, since a square total is decided at once.
+DEFAULT_TOTALS = [10 ** k + 1 for k in range(3, 8)]
+
+# rough_outcome_strategy with the old rough_outcome takes O(N * sqrt(N))
+# steps, which is minutes past this, so it is skipped there.
+OLD_STRATEGY_LIMIT = 2 * 10 ** 5
+
+
+def list_rough_outcome(state: SubtractSquareState) -> int:
+    """
+    Return the rough outcome of state the way rough_outcome used to: by
+    listing every remainder, up to the total, before deciding.
+    """
+    if is_pos_square(state.current_total):
+        return GameState.WIN
+    elif all([is_pos_square(state.current_total - n ** 2)
+              for n in range(1, state.current_total + 1)
+              if n ** 2 < state.current_total]):
+        return GameState.LOSE
+    return GameState.DRAW
+
+
+def time_call(call: Callable, repeat: int = 3) -> float:
+    """
+    Return the fewest seconds any of repeat calls of call took.
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def time_strategy(total: int, rough_outcome: Any, cache: Any,
+                  batched: bool = False) -> float:
+    """
+    Return the seconds rough_outcome_strategy takes to pick a move from
+    total, with rough_outcome in place of SubtractSquareState's and the
+    given ROUGH_OUTCOME_CACHE. Unless batched, the children are scored one
+    at a time.
+    """
+    game = SubtractSquareGame(True, total)
+    game.current_state = SubtractSquareState(True, total)
+    child_rough_outcomes = SubtractSquareState.child_rough_outcomes
+    if not batched:
+        child_rough_outcomes = GameState.child_rough_outcomes
+    with patch.object(SubtractSquareState, 'rough_outcome', rough_outcome), \
+            patch.object(SubtractSquareState, 'child_rough_outcomes',
+                         child_rough_outcomes), \
+            patch.object(subtract_square_state, 'ROUGH_OUTCOME_CACHE',
+                         cache):
+        return time_call(lambda: strategy.rough_outcome_strategy(game))
+
+
+def main(totals: List[int]) -> None:
+    """
+    Print a table of seconds taken by one rough_outcome, and by one move of
+    rough_outcome_strategy, from each total in totals.
+    """
+    new = SubtractSquareState.rough_outcome
+    print("{:>10}{:>12}{:>12}{:>12}{:>12}{:>12}{:>12}".format(
+        'total', 'old', 'isqrt', 'old move', 'isqrt move', 'cached move',
+        'batch move'))
+    for total in totals:
+        state = SubtractSquareState(True, total)
+        old_move = None
+        if total <= OLD_STRATEGY_LIMIT:
+            old_move = time_strategy(total, list_rough_outcome, None)
+        cache = {}
+        time_strategy(total, new, cache)
+        print("{:>10}{:>12.2e}{:>12.2e}{:>12}{:>12.2e}{:>12.2e}{:>12.2e}"
+              .format(total, time_call(lambda: list_rough_outcome(state), 1),
+                      time_call(state.rough_outcome),
+                      '-' if old_move is None else '{:.2e}'.format(old_move),
+                      time_strategy(total, new, None),
+                      time_strategy(total, new, cache),
+                      time_strategy(total, new, None, True)))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_TOTALS)
@@ -0,0 +1,313 @@
+"""
+Unittests for the search machinery behind the minimax strategies.
+
+These complement minimax_unittest_basic.py: instead of only checking the
+move returned, they check the values the searches compute and the shared
+caches they fill.
+"""
+
+import multiprocessing
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+import mcts
+import strategy
+from stonehenge import StonehengeGame
+from subtract_square_game import SubtractSquareGame
+from subtract_square_state import CompactSubtractSquareState, \
+    SubtractSquareState
+
+# Whether the player to move wins SubtractSquare from totals 0 to 20.
+SUBTRACT_SQUARE_WINS = [False, True, False, True, True, False, True, False,
+                        True, True, False, True, False, True, True, False,
+                        True, False, True, True, False]
+
+
+def make_subtract_square(total, p1_starts=True):
+    """
+    Return a new SubtractSquareGame starting from total.
+    """
+    with patch('builtins.input', return_value=str(total)):
+        return SubtractSquareGame(p1_starts)
+
+
+class TranspositionTableUnitTests(unittest.TestCase):
+    def setUp(self):
+        strategy.TRANSPOSITION_TABLE.clear()
+
+    def test_recursive_values(self):
+        """
+        Test that the recursive search finds the right value for every
+        SubtractSquare total up to 20.
+        """
+        for total, wins in enumerate(SUBTRACT_SQUARE_WINS):
+            if total == 0:
+                continue
+            game = make_subtract_square(total)
+            self.assertEqual(strategy.score(game), 1 if wins else -1,
+                             "Wrong value for a total of {}.".format(total))
+
+    def test_iterative_matches_recursive(self):
+        """
+        Test that the iterative search computes the same values as the
+        recursive one.
+        """
+        for total, wins in enumerate(SUBTRACT_SQUARE_WINS):
+            if total == 0:
+                continue
+            strategy.TRANSPOSITION_TABLE.clear()
+            game = make_subtract_square(total)
+            self.assertEqual(strategy.tree_score(game), 1 if wins else -1,
+                             "Wrong value for a total of {}.".format(total))
+
+    def test_table_is_shared(self):
+        """
+        Test that a position solved by one strategy is reused by the other.
+        """
+        game = make_subtract_square(30)
+        move = strategy.recursive_minimax(game)
+        stored = len(strategy.TRANSPOSITION_TABLE)
+        self.assertEqual(strategy.iterative_minimax(game), move)
+        self.assertEqual(len(strategy.TRANSPOSITION_TABLE), stored)
+
+    def test_one_entry_per_position(self):
+        """
+        Test that each distinct position is solved only once, so a solve
+        stores at most one entry per reachable non-final total.
+        """
+        game = make_subtract_square(200)
+        strategy.recursive_minimax(game)
+        self.assertLessEqual(len(strategy.TRANSPOSITION_TABLE), 2 * 200)
+        self.assertIsNotNone(strategy.TRANSPOSITION_TABLE.lookup(
+            CompactSubtractSquareState(True, 200)))
+
+
+class AlphaBetaUnitTests(unittest.TestCase):
+    def setUp(self):
+        strategy.TRANSPOSITION_TABLE.clear()
+
+    def test_recursive_values(self):
+        """
+        Test that the recursive alpha-beta search finds the right value for
+        every SubtractSquare total up to 20.
+        """
+        for total, wins in enumerate(SUBTRACT_SQUARE_WINS):
+            if total == 0:
+                continue
+            strategy.TRANSPOSITION_TABLE.clear()
+            game = make_subtract_square(total)
+            self.assertEqual(strategy.alphabeta_score(game),
+                             1 if wins else -1,
+                             "Wrong value for a total of {}.".format(total))
+
+    def test_iterative_values(self):
+        """
+        Test that the iterative alpha-beta search finds the right value for
+        every SubtractSquare total up to 20.
+        """
+        for total, wins in enumerate(SUBTRACT_SQUARE_WINS):
+            if total == 0:
+                continue
+            strategy.TRANSPOSITION_TABLE.clear()
+            game = make_subtract_square(total)
+            self.assertEqual(strategy.alphabeta_tree_score(game),
+                             1 if wins else -1,
+                             "Wrong value for a total of {}.".format(total))
+
+    def test_moves_are_winning(self):
+        """
+        Test that both alpha-beta strategies pick a move leaving the
+        opponent in a losing position whenever one exists.
+        """
+        for search in [strategy.recursive_alphabeta,
+                       strategy.iterative_alphabeta]:
+            for total in range(1, len(SUBTRACT_SQUARE_WINS)):
+                if not SUBTRACT_SQUARE_WINS[total]:
+                    continue
+                strategy.TRANSPOSITION_TABLE.clear()
+                move = search(make_subtract_square(total))
+                self.assertFalse(SUBTRACT_SQUARE_WINS[total - move],
+                                 "{} chose {} from {}.".format(
+                                     search.__name__, move, total))
+
+    def test_bounds_do_not_leak(self):
+        """
+        Test that bounds left by an alpha-beta search do not change the
+        values found later by the full searches.
+        """
+        game = make_subtract_square(60)
+        strategy.recursive_alphabeta(game)
+        for total in range(1, 61):
+            self.assertEqual(strategy.score(make_subtract_square(total)),
+                             strategy.tree_score(make_subtract_square(total)))
+
+
+class FlatTreeUnitTests(unittest.TestCase):
+    def setUp(self):
+        strategy.TRANSPOSITION_TABLE.clear()
+
+    def test_deeper_than_recursion_limit(self):
+        """
+        Test that the iterative search handles games deeper than Python's
+        recursion limit, since it keeps its own stack.
+        """
+        total = sys.getrecursionlimit() + 200
+        game = make_subtract_square(total)
+        expected = strategy.tree_score(game)
+        strategy.TRANSPOSITION_TABLE.clear()
+        for smaller in range(100, total, 100):
+            strategy.score(make_subtract_square(smaller))
+        self.assertEqual(strategy.score(game), expected)
+
+    def test_finished_subtrees_are_freed(self):
+        """
+        Test that a FlatTree drops a node's children once it is finished.
+        """
+        tree = strategy.FlatTree(SubtractSquareState(True, 5))
+        tree.expand(0, [[1, SubtractSquareState(False, 4)],
+                        [4, SubtractSquareState(False, 1)]])
+        tree.expand(2, [[1, SubtractSquareState(True, 0)]])
+        self.assertEqual(len(tree.state), 4)
+        tree.free_children(2)
+        self.assertEqual(len(tree.state), 3)
+        tree.free_children(0)
+        self.assertEqual([repr(state) for state in tree.state],
+                         [repr(SubtractSquareState(True, 5))])
+
+
+class IterativeDeepeningUnitTests(unittest.TestCase):
+    def test_finds_winning_moves(self):
+        """
+        Test that, given enough time, iterative deepening picks a move
+        leaving the opponent in a losing position whenever one exists.
+        """
+        for total in range(1, len(SUBTRACT_SQUARE_WINS)):
+            if not SUBTRACT_SQUARE_WINS[total]:
+                continue
+            move = strategy.iterative_deepening(make_subtract_square(total),
+                                                5.0)
+            self.assertFalse(SUBTRACT_SQUARE_WINS[total - move],
+                             "Chose {} from {}.".format(move, total))
+
+    def test_respects_deadline(self):
+        """
+        Test that iterative deepening returns a legal move close to its
+        deadline even when the game is far too big to search.
+        """
+        game = make_subtract_square(10 ** 6)
+        start = time.perf_counter()
+        move = strategy.iterative_deepening(game, 0.2)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertTrue(game.current_state.is_valid_move(move))
+
+
+class ParallelMinimaxUnitTests(unittest.TestCase):
+    def test_finds_winning_moves(self):
+        """
+        Test that parallel minimax picks a move leaving the opponent in a
+        losing position whenever one exists.
+        """
+        for total in range(1, len(SUBTRACT_SQUARE_WINS)):
+            if not SUBTRACT_SQUARE_WINS[total]:
+                continue
+            move = strategy.parallel_minimax(make_subtract_square(total))
+            self.assertFalse(SUBTRACT_SQUARE_WINS[total - move],
+                             "Chose {} from {}.".format(move, total))
+
+    def test_lost_position_returns_legal_move(self):
+        """
+        Test that parallel minimax still returns a legal move when every
+        move loses.
+        """
+        game = make_subtract_square(20)
+        move = strategy.parallel_minimax(game)
+        self.assertTrue(game.current_state.is_valid_move(move))
+
+    def test_stonehenge(self):
+        """
+        Test that parallel minimax solves a Stonehenge position that is not
+        in a tablebase, with states sent to the workers by key.
+        """
+        game = StonehengeGame(True, 2)
+        with patch.object(strategy, 'tablebase_move', lambda state: None):
+            move = strategy.parallel_minimax(game)
+        strategy.TRANSPOSITION_TABLE.clear()
+        game.current_state = game.current_state.make_move(move)
+        self.assertEqual(strategy.alphabeta_tree_score(game), -1)
+
+    def test_stale_subtrees_stop(self):
+        """
+        Test that a subtree is dropped once the search it belongs to is
+        over, or once a win has been found for its root.
+        """
+        search = multiprocessing.RawValue('q', 1)
+        alpha = multiprocessing.RawValue('b', -1)
+        with patch.dict(strategy.WORKER):
+            strategy.start_worker(search, alpha)
+            state = SubtractSquareState(False, 18)
+            self.assertEqual(strategy.solve_subtree(SubtractSquareGame,
+                                                    state, 1), 1)
+            self.assertIsNone(strategy.solve_subtree(SubtractSquareGame,
+                                                     state, 0))
+            alpha.value = 1
+            self.assertIsNone(strategy.solve_subtree(SubtractSquareGame,
+                                                     state, 1))
+        with self.assertRaises(strategy.Cancelled):
+            strategy.flat_tree_score(make_subtract_square(18), True,
+                                     stopped=lambda: True)
+
+
+class MCTSUnitTests(unittest.TestCase):
+    def test_finds_winning_moves(self):
+        """
+        Test that MCTS picks a move leaving the opponent in a losing
+        position on small SubtractSquare totals.
+        """
+        for total in [4, 8, 11, 18]:
+            search = mcts.MCTSStrategy(playouts=2000, seed=total)
+            move = search(make_subtract_square(total))
+            self.assertFalse(SUBTRACT_SQUARE_WINS[total - move],
+                             "Chose {} from {}.".format(move, total))
+
+    def test_time_limit(self):
+        """
+        Test that MCTS with only a time limit stops close to it.
+        """
+        search = mcts.MCTSStrategy(playouts=None, time_limit=0.2, seed=0)
+        start = time.perf_counter()
+        search(make_subtract_square(300))
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_no_budget(self):
+        """
+        Test that MCTS still returns a legal move when its budget runs out
+        before the first random game.
+        """
+        for search, game in [
+                [mcts.MCTSStrategy(playouts=0), make_subtract_square(20)],
+                [mcts.MCTSStrategy(playouts=None, time_limit=1e-9),
+                 StonehengeGame(True, 5)]]:
+            move = search(game)
+            self.assertTrue(game.current_state.is_valid_move(move))
+
+    def test_reuses_subtree(self):
+        """
+        Test that after the opponent replies, the next search starts from
+        the node already grown for the reply.
+        """
+        search = mcts.MCTSStrategy(playouts=500, seed=1)
+        game = make_subtract_square(30)
+        move = search(game)
+        game.current_state = game.current_state.make_move(move)
+        reply = max(search.root.children, key=lambda child: child.visits)
+        game.current_state = reply.state
+        visits = reply.visits
+        search(game)
+        self.assertIsNone(reply.parent)
+        self.assertEqual(reply.visits, visits + 500)
+
+
+if __name__ == "__main__":
+    unittest.main()
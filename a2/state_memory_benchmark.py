@@ -0,0 +1,100 @@
+"""
+Compare how much memory SubtractSquareState and CompactSubtractSquareState
+take, both one state at a time and at the peak of a minimax search, using
+tracemalloc.
+
+Run it from this directory:  python state_memory_benchmark.py
+
+NOTE: You do not have to run python-ta on this file.
+"""
+import tracemalloc
+from typing import Any, Callable, List
+from unittest.mock import patch
+
+import strategy
+import subtract_square_state
+from subtract_square_game import SubtractSquareGame
+from subtract_square_state import CompactSubtractSquareState, \
+    SubtractSquareState
+
+STATE_CLASSES = [SubtractSquareState, CompactSubtractSquareState]
+
+SUBTRACT_SQUARE_TOTALS = [100, 300, 1000]
+
+SEARCHES = [('tree_score', strategy.tree_score),
+            ('alphabeta_tree_score', strategy.alphabeta_tree_score)]
+
+
+def bytes_per_state(state_class: Any, count: int = 100000) -> float:
+    """
+    Return the average number of bytes allocated for each of count new
+    state_class states, not counting the list holding them.
+    """
+    tracemalloc.start()
+    states = [None] * count
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(count):
+        states[i] = state_class(i % 2 == 0, i)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used / len(states)
+
+
+def search_memory(state_class: Any, search: Callable,
+                  total: int) -> List[float]:
+    """
+    Return [nodes generated, peak bytes, peak bytes per node] for search
+    on a SubtractSquare game of state_class starting from total, with an
+    empty transposition table.
+
+    A node is counted every time the search calls make_move, i.e. for
+    every child position it creates. The peak includes everything the
+    search keeps alive, including the transposition table and any states
+    it interns.
+    """
+    game = SubtractSquareGame(True, total)
+    game.current_state = state_class(True, total)
+    calls = [0]
+    make_move = state_class.make_move
+
+    def counting_make_move(self: Any, move: Any) -> Any:
+        """
+        Count this call, then defer to the real make_move.
+        """
+        calls[0] += 1
+        return make_move(self, move)
+
+    strategy.TRANSPOSITION_TABLE.clear()
+    subtract_square_state.INTERNED_STATES.clear()
+    with patch.object(state_class, 'make_move', counting_make_move):
+        tracemalloc.start()
+        search(game)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    strategy.TRANSPOSITION_TABLE.clear()
+    return [calls[0], peak, peak / max(calls[0], 1)]
+
+
+def main() -> None:
+    """
+    Print the size of one state of each class, then a table of the peak
+    memory of every search on each class.
+    """
+    for state_class in STATE_CLASSES:
+        print("{:<28}{:>8.1f} bytes per state".format(
+            state_class.__name__, bytes_per_state(state_class)))
+    print()
+    print("{:<10}{:>22}{:>28}{:>10}{:>12}{:>10}".format(
+        'total', 'search', 'state', 'nodes', 'peak bytes', 'per node'))
+    for total in SUBTRACT_SQUARE_TOTALS:
+        for name, search in SEARCHES:
+            for state_class in STATE_CLASSES:
+                nodes, peak, per_node = search_memory(state_class, search,
+                                                      total)
+                print("{:<10}{:>22}{:>28}{:>10}{:>12}{:>10.1f}".format(
+                    total, name, state_class.__name__, nodes, peak,
+                    per_node))
+
+
+if __name__ == "__main__":
+    main()
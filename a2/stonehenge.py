@@ -0,0 +1,720 @@
+"""
+An implementation of Stonehenge.
+
+NOTE: You do not have to run python-ta on this file.
+"""
+import itertools
+import random
+import string
+from typing import Any, Dict, List, Optional
+from game import Game
+from game_state import GameState
+
+# The names of the cells, in reading order.
+LETTERS = string.ascii_uppercase
+
+# The largest side length whose cells all have a letter: a board of side n
+# has n * (n + 5) // 2 cells.
+MAX_SIDE_LENGTH = 5
+
+# The ley-line families: along a row, and diagonally down-left ('/') or
+# down-right ('\') through the rows.
+FAMILIES = ['-', '/', '\\']
+
+# The number of bits given to each ley-line's counter in a packed counter.
+COUNTER_BITS = 8
+COUNTER_MASK = (1 << COUNTER_BITS) - 1
+
+
+def build_cells(side_length: int) -> List[List[int]]:
+    """
+    Return the [row, position in row] of every cell of a board with
+    side_length, in reading order.
+
+    Rows 0 to side_length - 1 have 2 to side_length + 1 cells, and the last
+    row has side_length cells.
+
+    >>> build_cells(1)
+    [[0, 0], [0, 1], [1, 0]]
+    """
+    cells = []
+    for row in range(side_length):
+        cells.extend([[row, k] for k in range(row + 2)])
+    cells.extend([[side_length, k] for k in range(side_length)])
+    return cells
+
+
+def build_ley_lines(side_length: int) -> List[List[Any]]:
+    """
+    Return [family, indices of its cells] for every ley-line of a board
+    with side_length, in the order their markers appear in the board's
+    string.
+
+    >>> build_ley_lines(1)
+    [['/', [0]], ['/', [1, 2]], ['-', [0, 1]], ['-', [2]], ['\\\\', [1]], \
+['\\\\', [0, 2]]]
+    """
+    cells = build_cells(side_length)
+    n = side_length
+
+    def row(r: int) -> List[Any]:
+        return ['-', [i for i in range(len(cells)) if cells[i][0] == r]]
+
+    def up_right(d: int) -> List[Any]:
+        return ['/', [i for i in range(len(cells))
+                      if (cells[i][0] < n and cells[i][1] == d) or
+                      (cells[i][0] == n and cells[i][1] == d - 1)]]
+
+    def down_right(e: int) -> List[Any]:
+        return ['\\', [i for i in range(len(cells))
+                       if (cells[i][0] < n and cells[i][1] - cells[i][0] == e)
+                       or (cells[i][0] == n and cells[i][1] + 1 - n == e)]]
+
+    lines = [up_right(0), up_right(1)]
+    for r in range(n - 1):
+        lines.extend([row(r), up_right(r + 2)])
+    lines.extend([row(n - 1), row(n), down_right(1)])
+    lines.extend([down_right(k + 1 - n) for k in range(n)])
+    return lines
+
+
+def build_template(side_length: int) -> List[List[Any]]:
+    """
+    Return where each character of a board with side_length goes when it is
+    drawn: a list of [line, column, token], where token is a fixed character
+    or ['cell', i] / ['ley-line', i] for the marker of cell or ley-line i.
+    """
+    cells = build_cells(side_length)
+    n = side_length
+
+    def column(i: int) -> int:
+        r, k = cells[i]
+        if r == n:
+            return 6 + 4 * k
+        return 2 * (n - 1 - r) + 4 + 4 * k
+
+    template = []
+    by_row = [[i for i in range(len(cells)) if cells[i][0] == r]
+              for r in range(n + 1)]
+    marker = 0
+    # Top: the markers of the first two '/' ley-lines.
+    for i in by_row[0]:
+        template.append([0, column(i) + 2, ['ley-line', marker]])
+        template.append([1, column(i) + 1, '/'])
+        marker += 1
+    for r in range(n + 1):
+        y = 2 + 2 * r
+        first = column(by_row[r][0])
+        template.append([y, first - 4, ['ley-line', marker]])
+        marker += 1
+        for i in by_row[r]:
+            template.append([y, column(i) - 2, '-'])
+            template.append([y, column(i), ['cell', i]])
+        last = column(by_row[r][-1])
+        if r != n - 1:
+            template.append([y, last + 4, ['ley-line', marker]])
+            marker += 1
+        if r < n - 1:
+            for i in by_row[r]:
+                template.append([y + 1, column(i) - 1, '/'])
+                template.append([y + 1, column(i) + 1, '\\'])
+            template.append([y + 1, last + 3, '/'])
+        elif r == n - 1:
+            for i in by_row[r]:
+                if i != by_row[r][0]:
+                    template.append([y + 1, column(i) - 1, '/'])
+                template.append([y + 1, column(i) + 1, '\\'])
+    # Bottom: the markers of the '\' ley-lines ending in the last row.
+    y = 2 + 2 * n
+    for i in by_row[n]:
+        template.append([y + 1, column(i) + 1, '\\'])
+        template.append([y + 2, column(i) + 2, ['ley-line', marker]])
+        marker += 1
+    return template
+
+
+def build_symmetries(side_length: int) -> List[List[List[int]]]:
+    """
+    Return [cell permutation, ley-line permutation] for every symmetry of a
+    board with side_length, starting with the identity.
+
+    A cell is pinned down by which ley-line of each family it is on, so a
+    symmetry is a way of reordering the families, and reversing the order
+    of the ley-lines of some of them, which takes every cell to a cell.
+
+    >>> len(build_symmetries(1)), len(build_symmetries(3))
+    (6, 2)
+    """
+    lines = build_ley_lines(side_length)
+    families = [[j for j in range(len(lines)) if lines[j][0] == family]
+                for family in FAMILIES]
+    places = [[[k for k in range(len(family)) if i in lines[family[k]][1]][0]
+               for family in families]
+              for i in range(len(build_cells(side_length)))]
+    cell_of = {tuple(places[i]): i for i in range(len(places))}
+    symmetries = []
+    for order in itertools.permutations(range(3)):
+        for flips in itertools.product([False, True], repeat=3):
+            images = [tuple(side_length - place[order[f]] if flips[f]
+                            else place[order[f]] for f in range(3))
+                      for place in places]
+            if any(image not in cell_of for image in images):
+                continue
+            line_images = [0] * len(lines)
+            for f in range(3):
+                for k in range(len(families[order[f]])):
+                    line_images[families[order[f]][k]] = \
+                        families[f][side_length - k if flips[f] else k]
+            symmetries.append([[cell_of[image] for image in images],
+                               line_images])
+    return symmetries
+
+
+def build_mask_tables(permutation: List[int]) -> List[List[int]]:
+    """
+    Return tables for map_mask to move bit i of a mask to bit
+    permutation[i], one table for each byte of the mask.
+
+    >>> map_mask(0b011, build_mask_tables([2, 0, 1]))
+    5
+    """
+    tables = []
+    for start in range(0, len(permutation), 8):
+        table = []
+        for byte in range(256):
+            table.append(sum(1 << permutation[start + k] for k in range(8)
+                             if byte >> k & 1 and
+                             start + k < len(permutation)))
+        tables.append(table)
+    return tables
+
+
+def map_mask(mask: int, tables: List[List[int]]) -> int:
+    """
+    Return mask with its bits moved by the tables of build_mask_tables.
+    """
+    image = 0
+    for table in tables:
+        image |= table[mask & 255]
+        mask >>= 8
+    return image
+
+
+class StonehengeTopology:
+    """
+    Everything about a Stonehenge board that depends only on its side
+    length, worked out once and shared by every state of that size.
+
+    side_length - the side length of the board
+    coordinates - the [row, position in row] of each cell
+    index - the index of the cell named by each letter
+    letters - the letter of each cell
+    families - the indices of the ley-lines of each family in FAMILIES
+    line_cells - the indices of the cells on each ley-line
+    cell_lines - the indices of the ley-lines through each cell
+    line_masks - a mask of the cells on each ley-line
+    line_sizes - the number of cells on each ley-line
+    cell_bits - the bit of each cell
+    line_needs - the number of cells of each ley-line that claim it
+    line_shifts - where each ley-line's counter starts in a packed counter
+    cell_counts - what claiming each cell adds to a packed counter: one to
+                  the counter of every ley-line through it
+    rows - the characters of the drawing of an empty board, with a
+           space wherever a cell or ley-line marker goes
+    cell_places - the [row, column] of each cell in rows
+    line_places - the [row, column] of each ley-line marker in rows
+    zobrist - the random keys the hash of a state is built from
+    symmetries - [cell permutation, ley-line permutation] for each symmetry
+                 of the board, starting with the identity
+    inverses - the cell permutation undoing each symmetry
+    mask_tables - [cell tables, ley-line tables] for map_mask to apply each
+                  symmetry to masks
+    """
+    side_length: int
+    coordinates: List[List[int]]
+    index: Dict[str, int]
+    letters: List[str]
+    families: Dict[str, List[int]]
+    line_cells: List[List[int]]
+    cell_lines: List[List[int]]
+    line_masks: List[int]
+    line_sizes: List[int]
+    cell_bits: List[int]
+    line_needs: List[int]
+    line_shifts: List[int]
+    cell_counts: List[int]
+    rows: List[List[str]]
+    cell_places: List[List[int]]
+    line_places: List[List[int]]
+    zobrist: dict
+    symmetries: List[List[List[int]]]
+    inverses: List[List[int]]
+    mask_tables: List[List[List[List[int]]]]
+
+    def __init__(self, side_length: int) -> None:
+        """
+        Initialize the topology of a board with side_length.
+        """
+        self.side_length = side_length
+        self.coordinates = build_cells(side_length)
+        cell_count = len(self.coordinates)
+        self.letters = list(LETTERS[:cell_count])
+        self.index = {self.letters[i]: i for i in range(cell_count)}
+        lines = build_ley_lines(side_length)
+        self.families = {family: [j for j in range(len(lines))
+                                  if lines[j][0] == family]
+                         for family in FAMILIES}
+        self.line_cells = [line[1] for line in lines]
+        self.cell_lines = [[j for j in range(len(lines))
+                            if i in self.line_cells[j]]
+                           for i in range(cell_count)]
+        self.line_masks = [sum(1 << i for i in line)
+                           for line in self.line_cells]
+        self.line_sizes = [len(line) for line in self.line_cells]
+        self.cell_bits = [1 << i for i in range(cell_count)]
+        self.line_needs = [(size + 1) // 2 for size in self.line_sizes]
+        self.line_shifts = [COUNTER_BITS * j for j in range(len(lines))]
+        self.cell_counts = [sum(1 << self.line_shifts[j]
+                                for j in self.cell_lines[i])
+                            for i in range(cell_count)]
+        self.rows = [[] for _ in range(2 * side_length + 5)]
+        self.cell_places = [[]] * cell_count
+        self.line_places = [[]] * len(lines)
+        for y, x, token in build_template(side_length):
+            self.rows[y].extend(' ' * (x + 1 - len(self.rows[y])))
+            if isinstance(token, list):
+                places = self.cell_places if token[0] == 'cell' \
+                    else self.line_places
+                places[token[1]] = [y, x]
+            else:
+                self.rows[y][x] = token
+        # Seeding with the side length gives every board of one size the
+        # same keys, so equal states hash equally across processes.
+        rng = random.Random(side_length)
+        self.zobrist = {
+            'turn': rng.getrandbits(64),
+            'cells': [[rng.getrandbits(64) for _ in range(2)]
+                      for _ in range(cell_count)],
+            'lines': [[rng.getrandbits(64) for _ in range(2)]
+                      for _ in range(len(lines))]}
+        self.symmetries = build_symmetries(side_length)
+        self.inverses = [[cells.index(i) for i in range(cell_count)]
+                         for cells, _ in self.symmetries]
+        self.mask_tables = [[build_mask_tables(cells),
+                             build_mask_tables(lines)]
+                            for cells, lines in self.symmetries]
+
+    def pack(self, is_p1_turn: bool, cells: List[int],
+             claims: List[int]) -> int:
+        """
+        Return the key of the position of a board of this size with the cell
+        and ley-line masks cells and claims, and the current player based on
+        is_p1_turn.
+
+        From the lowest bit up, a key holds the side length (3 bits),
+        whether it is p1's turn, both players' cell masks and both players'
+        ley-line masks, so keys of different side lengths never clash.
+        """
+        cell_count = len(self.cell_bits)
+        line_count = len(self.line_sizes)
+        return (self.side_length | int(is_p1_turn) << 3 | cells[0] << 4 |
+                cells[1] << 4 + cell_count |
+                claims[0] << 4 + 2 * cell_count |
+                claims[1] << 4 + 2 * cell_count + line_count)
+
+
+# The topology of each side length used so far in this process.
+TOPOLOGIES = {}
+
+
+def get_topology(side_length: int) -> StonehengeTopology:
+    """
+    Return the shared StonehengeTopology of a board with side_length,
+    building it if this is the first board of that size.
+
+    Raise ValueError if side_length is not from 1 to MAX_SIDE_LENGTH.
+
+    >>> get_topology(2) is get_topology(2)
+    True
+    >>> get_topology(6)
+    Traceback (most recent call last):
+    ...
+    ValueError: side length must be from 1 to 5, not 6
+    """
+    if side_length not in TOPOLOGIES:
+        if not 1 <= side_length <= MAX_SIDE_LENGTH:
+            raise ValueError("side length must be from 1 to {}, not {}"
+                             .format(MAX_SIDE_LENGTH, side_length))
+        TOPOLOGIES[side_length] = StonehengeTopology(side_length)
+    return TOPOLOGIES[side_length]
+
+
+class StonehengeState(GameState):
+    """
+    The state of a game of Stonehenge at a certain point in time.
+
+    Cells and ley-lines are stored as bitboards: bit i of a mask stands for
+    cell (or ley-line) i, so claiming, counting and listing them are a few
+    integer operations.
+
+    topology - the layout of the board, shared with every state of its size
+    cells - a mask of the cells claimed by p1, and one for p2
+    claims - a mask of the ley-lines claimed by p1, and one for p2
+    counters - how many cells of each ley-line p1 has claimed, packed into
+               one integer of COUNTER_BITS-bit fields, and the same for p2
+    held - how many ley-lines p1 has claimed, and how many p2 has
+    won_by - 'p1' or 'p2' once that player has claimed at least half of
+             the ley-lines, otherwise None
+    hash_value - the Zobrist hash of this state, kept up to date by
+                 make_move
+    canonical_form - what canonical() returns, or None until it is first
+                     asked for
+    """
+    topology: StonehengeTopology
+    cells: List[int]
+    claims: List[int]
+    counters: List[int]
+    held: List[int]
+    won_by: Any
+    hash_value: int
+    canonical_form: Optional[List[int]]
+
+    def __init__(self, is_p1_turn: bool, side_length: int) -> None:
+        """
+        Initialize this game state as an empty board with side_length,
+        with the current player based on is_p1_turn.
+        """
+        super().__init__(is_p1_turn)
+        self.topology = get_topology(side_length)
+        self.cells = [0, 0]
+        self.claims = [0, 0]
+        self.counters = [0, 0]
+        self.held = [0, 0]
+        self.won_by = None
+        self.hash_value = self.topology.zobrist['turn'] if is_p1_turn else 0
+        self.canonical_form = None
+
+    @classmethod
+    def from_masks(cls, is_p1_turn: bool, side_length: int, cells: List[int],
+                   claims: List[int]) -> 'StonehengeState':
+        """
+        Return the state of a board with side_length whose cells and
+        ley-lines are claimed as in the masks cells and claims, with the
+        current player based on is_p1_turn.
+        """
+        state = cls(is_p1_turn, side_length)
+        topology = state.topology
+        state.cells = list(cells)
+        state.claims = list(claims)
+        state.counters = [sum(topology.cell_counts[i]
+                              for i in range(len(topology.cell_bits))
+                              if mask >> i & 1) for mask in cells]
+        state.held = [bin(mask).count('1') for mask in claims]
+        for player in range(2):
+            if 2 * state.held[player] >= len(topology.line_sizes):
+                state.won_by = 'p{}'.format(player + 1)
+        state.hash_value = state.compute_hash()
+        return state
+
+    @classmethod
+    def from_key(cls, key: int) -> 'StonehengeState':
+        """
+        Return the state whose key is key.
+
+        >>> state = StonehengeState(False, 2).make_move('C').make_move('E')
+        >>> StonehengeState.from_key(state.key()) == state
+        True
+        """
+        topology = get_topology(key & 7)
+        cell_count = len(topology.cell_bits)
+        line_count = len(topology.line_sizes)
+        cells, lines = (1 << cell_count) - 1, (1 << line_count) - 1
+        key >>= 3
+        return cls.from_masks(
+            bool(key & 1), topology.side_length,
+            [key >> 1 & cells, key >> 1 + cell_count & cells],
+            [key >> 1 + 2 * cell_count & lines,
+             key >> 1 + 2 * cell_count + line_count & lines])
+
+    def __reduce__(self) -> tuple:
+        """
+        Return how to rebuild this state from its key, for pickle and copy,
+        so the shared topology is not copied along with it.
+
+        >>> import pickle
+        >>> state = StonehengeState(True, 2).make_move('B')
+        >>> pickle.loads(pickle.dumps(state)) == state
+        True
+        """
+        return StonehengeState.from_key, (self.key(),)
+
+    def key(self) -> int:
+        """
+        Return the integer key of this position.
+
+        >>> StonehengeState(True, 1).make_move('A').key()
+        37905
+        """
+        return self.topology.pack(self.p1_turn, self.cells, self.claims)
+
+    def canonical(self) -> List[int]:
+        """
+        Return [key, symmetry]: the smallest key of any reflection or
+        rotation of this position, and the index in topology.symmetries of
+        the one which has it.
+
+        Positions which are reflections or rotations of each other have the
+        same canonical key. It is worked out once per state, since a search
+        asks for it every time it looks the state up or stores it.
+
+        >>> state = StonehengeState(True, 2)
+        >>> state.make_move('A').canonical()[0] == \\
+        ...     state.make_move('B').canonical()[0]
+        False
+        >>> state.make_move('A').canonical()[0] == \\
+        ...     state.make_move('G').canonical()[0]
+        True
+        """
+        if self.canonical_form is not None:
+            return self.canonical_form
+        topology = self.topology
+        best = [self.key(), 0]
+        for symmetry in range(1, len(topology.symmetries)):
+            cell_tables, line_tables = topology.mask_tables[symmetry]
+            key = topology.pack(
+                self.p1_turn,
+                [map_mask(mask, cell_tables) for mask in self.cells],
+                [map_mask(mask, line_tables) for mask in self.claims])
+            if key < best[0]:
+                best = [key, symmetry]
+        self.canonical_form = best
+        return best
+
+    def canonical_move(self, move: Any, symmetry: int) -> Any:
+        """
+        Return the move which is move once this position is turned by
+        symmetry, or None if move is None.
+        """
+        if move is None:
+            return None
+        topology = self.topology
+        return topology.letters[
+            topology.symmetries[symmetry][0][topology.index[move]]]
+
+    def original_move(self, move: Any, symmetry: int) -> Any:
+        """
+        Return the move of this position which becomes move once it is
+        turned by symmetry, or None if move is None.
+        """
+        if move is None:
+            return None
+        topology = self.topology
+        return topology.letters[
+            topology.inverses[symmetry][topology.index[move]]]
+
+    def __str__(self) -> str:
+        """
+        Return a string representation of the current state of the game.
+        """
+        topology = self.topology
+        rows = [row.copy() for row in topology.rows]
+        for i in range(len(topology.cell_places)):
+            y, x = topology.cell_places[i]
+            if self.cells[0] >> i & 1:
+                rows[y][x] = '1'
+            elif self.cells[1] >> i & 1:
+                rows[y][x] = '2'
+            else:
+                rows[y][x] = topology.letters[i]
+        for i in range(len(topology.line_places)):
+            y, x = topology.line_places[i]
+            if self.claims[0] >> i & 1:
+                rows[y][x] = '1'
+            elif self.claims[1] >> i & 1:
+                rows[y][x] = '2'
+            else:
+                rows[y][x] = '@'
+        return "\n".join("".join(row).rstrip() for row in rows if row)
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether self and other are the same position.
+        """
+        return (type(self) == type(other)
+                and self.hash_value == other.hash_value
+                and self.p1_turn == other.p1_turn
+                and self.topology.side_length == other.topology.side_length
+                and self.cells == other.cells
+                and self.claims == other.claims)
+
+    def __hash__(self) -> int:
+        """
+        Return the Zobrist hash of this position.
+        """
+        return self.hash_value
+
+    def compute_hash(self) -> int:
+        """
+        Return the Zobrist hash of this position worked out from scratch,
+        which hash_value should always equal.
+        """
+        zobrist = self.topology.zobrist
+        value = zobrist['turn'] if self.p1_turn else 0
+        for player in range(2):
+            for i in range(len(self.topology.cell_bits)):
+                if self.cells[player] >> i & 1:
+                    value ^= zobrist['cells'][i][player]
+            for i in range(len(self.topology.line_masks)):
+                if self.claims[player] >> i & 1:
+                    value ^= zobrist['lines'][i][player]
+        return value
+
+    def winner(self) -> Any:
+        """
+        Return 'p1' or 'p2' if that player has claimed at least half of the
+        ley-lines, or None if neither has.
+        """
+        return self.won_by
+
+    def get_possible_moves(self) -> list:
+        """
+        Return all possible moves that can be applied to this state.
+        """
+        if self.won_by is not None:
+            return []
+        taken = self.cells[0] | self.cells[1]
+        return [LETTERS[i] for i, bit in enumerate(self.topology.cell_bits)
+                if not taken & bit]
+
+    def make_move(self, move: Any) -> 'StonehengeState':
+        """
+        Return the GameState that results from applying move to this
+        GameState.
+
+        Only the three ley-lines through the claimed cell can change hands,
+        so only their counters are bumped and checked, and the hash is
+        updated by XOR-ing in just the keys for the claimed cell, the newly
+        claimed ley-lines and the change of turn.
+        """
+        topology = self.topology
+        zobrist = topology.zobrist
+        player = 0 if self.p1_turn else 1
+        cell = topology.index[move]
+        counter = self.counters[player] + topology.cell_counts[cell]
+        claimed = self.claims[0] | self.claims[1]
+        claims = self.claims[player]
+        held = self.held[player]
+        value = self.hash_value ^ zobrist['turn'] ^ \
+            zobrist['cells'][cell][player]
+        for line in topology.cell_lines[cell]:
+            if not claimed >> line & 1 and \
+                    counter >> topology.line_shifts[line] & COUNTER_MASK \
+                    >= topology.line_needs[line]:
+                claims |= 1 << line
+                held += 1
+                value ^= zobrist['lines'][line][player]
+        # Skips __init__, which would set up an empty board only for it to
+        # be overwritten.
+        new_state = StonehengeState.__new__(StonehengeState)
+        new_state.p1_turn = not self.p1_turn
+        new_state.topology = topology
+        new_state.cells = self.cells.copy()
+        new_state.cells[player] |= topology.cell_bits[cell]
+        new_state.claims = self.claims.copy()
+        new_state.claims[player] = claims
+        new_state.counters = self.counters.copy()
+        new_state.counters[player] = counter
+        new_state.held = self.held.copy()
+        new_state.held[player] = held
+        new_state.won_by = self.won_by
+        if 2 * held >= len(topology.line_sizes):
+            new_state.won_by = self.get_current_player_name()
+        new_state.hash_value = value
+        new_state.canonical_form = None
+        return new_state
+
+    def __repr__(self) -> str:
+        """
+        Return a representation of this state (which can be used for
+        equality testing).
+        """
+        return "P1's Turn: {} - Board:\n{}".format(self.p1_turn, str(self))
+
+    def rough_outcome(self) -> float:
+        """
+        Return an estimate in interval [LOSE, WIN] of best outcome the current
+        player can guarantee from state self.
+        """
+        if self.winner() is not None:
+            if self.winner() == self.get_current_player_name():
+                return self.WIN
+            return self.LOSE
+        children = [self.make_move(move) for move in self.get_possible_moves()]
+        if any(child.winner() is not None for child in children):
+            return self.WIN
+        if all(any(grandchild.winner() is not None
+                   for grandchild in [child.make_move(move) for move in
+                                      child.get_possible_moves()])
+               for child in children):
+            return self.LOSE
+        return self.DRAW
+
+
+class StonehengeGame(Game):
+    """
+    A game of Stonehenge.
+    """
+    current_state: StonehengeState
+
+    def __init__(self, p1_starts: bool,
+                 side_length: Optional[int] = None) -> None:
+        """
+        Initialize this Game, using p1_starts to find who the first player
+        is, on a board with side_length, or asking for the side length of
+        the board if side_length is None.
+        """
+        if side_length is None:
+            side_length = int(input("Enter the side length of the board: "))
+        self.current_state = StonehengeState(p1_starts, side_length)
+
+    def get_instructions(self) -> str:
+        """
+        Return the instructions for this Game.
+        """
+        return "Players take turns claiming cells. A player claims a " + \
+            "ley-line once they have claimed at least half of its cells. " + \
+            "The first player to claim at least half of the ley-lines wins."
+
+    def is_over(self, state: StonehengeState) -> bool:
+        """
+        Return whether or not this game is over at state.
+        """
+        return state.winner() is not None
+
+    def is_winner(self, player: str) -> bool:
+        """
+        Return whether player has won the game.
+
+        Precondition: player is 'p1' or 'p2'.
+        """
+        return self.is_winner_at(self.current_state, player)
+
+    def is_winner_at(self, state: StonehengeState, player: str) -> bool:
+        """
+        Return whether player has won the game at state.
+
+        Precondition: player is 'p1' or 'p2'.
+        """
+        return state.winner() == player
+
+    def str_to_move(self, string: str) -> Any:
+        """
+        Return the move that string represents. If string is not a move,
+        return some invalid move.
+        """
+        return string.strip().upper()
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
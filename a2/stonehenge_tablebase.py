@@ -0,0 +1,353 @@
+"""
+An endgame tablebase for Stonehenge: the value and a best move of every
+reachable position of a small board, kept in a sorted binary file which is
+looked up through mmap.
+
+Build and check the tables from this directory:
+
+    python stonehenge_tablebase.py generate [side_length ...]
+    python stonehenge_tablebase.py verify [side_length ...]
+
+Generation works one layer (number of claimed cells) at a time and saves
+each layer as it goes, so an interrupted run picks up where it stopped.
+
+NOTE: You do not have to run python-ta on this file.
+"""
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+from stonehenge import StonehengeState, get_topology
+
+# Where the tables are kept, and the sides they are loaded for. Positions
+# of larger boards do not fit in a 64-bit key.
+TABLEBASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'tablebases')
+SIDE_LENGTHS = [1, 2, 3]
+
+# A table is a header followed by one record per position, sorted by key.
+# Only the canonical position of each set of reflections and rotations is
+# stored, keyed by StonehengeState.canonical(). value is WIN (1) or LOSE (-1)
+# for the player to move, and move is the index of the cell of the canonical
+# position to claim, or NO_MOVE once the game is over.
+HEADER = struct.Struct('<4sHHQ')
+MAGIC = b'SHTB'
+VERSION = 2
+RECORD = struct.Struct('<QbB')
+NO_MOVE = 255
+
+
+def canonical_key(state: StonehengeState) -> int:
+    """
+    Return the key state is stored under: the same for all of its
+    reflections and rotations.
+    """
+    return state.canonical()[0]
+
+
+def table_path(side_length: int, directory: str = TABLEBASE_DIR) -> str:
+    """
+    Return the path of the table of boards with side_length in directory.
+    """
+    return os.path.join(directory, 'stonehenge_{}.tb'.format(side_length))
+
+
+def layer_path(side_length: int, layer: int, kind: str,
+               directory: str = TABLEBASE_DIR) -> str:
+    """
+    Return the path of the keys or solved records (depending on kind) of
+    one layer of an unfinished table.
+    """
+    return '{}.layer{}.{}'.format(table_path(side_length, directory), layer,
+                                  kind)
+
+
+def save(path: str, data: bytes) -> None:
+    """
+    Write data to path, so that path never holds a partly written file.
+    """
+    with open(path + '.tmp', 'wb') as file:
+        file.write(data)
+    os.replace(path + '.tmp', path)
+
+
+def reachable_layers(side_length: int,
+                     directory: str = TABLEBASE_DIR) -> List[array]:
+    """
+    Return the sorted canonical keys of every position of a board with
+    side_length reachable from an empty board, grouped by the number of
+    claimed cells.
+
+    Layers already saved in directory are read instead of worked out.
+    """
+    layers = []
+    for layer in range(len(get_topology(side_length).cell_bits) + 1):
+        path = layer_path(side_length, layer, 'keys', directory)
+        keys = array('Q')
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                keys.frombytes(file.read())
+        else:
+            if layer == 0:
+                children = {canonical_key(StonehengeState(p1_turn,
+                                                          side_length))
+                            for p1_turn in [True, False]}
+            else:
+                children = set()
+                for key in layers[-1]:
+                    state = StonehengeState.from_key(key)
+                    for move in state.get_possible_moves():
+                        children.add(canonical_key(state.make_move(move)))
+            keys.extend(sorted(children))
+            save(path, keys.tobytes())
+        layers.append(keys)
+    return layers
+
+
+def solve_position(state: StonehengeState,
+                   values: Dict[int, int]) -> Tuple[int, int]:
+    """
+    Return the value and the index of a best move of state, given the
+    values of all of its children in values.
+    """
+    if state.winner() is not None:
+        return state.LOSE, NO_MOVE
+    best_value, best_move = state.LOSE - 1, NO_MOVE
+    for move in state.get_possible_moves():
+        value = -values[canonical_key(state.make_move(move))]
+        if value > best_value:
+            best_value, best_move = value, state.topology.index[move]
+            if value == state.WIN:
+                break
+    return best_value, best_move
+
+
+def solve_layers(side_length: int, layers: List[array],
+                 directory: str = TABLEBASE_DIR) -> List[bytes]:
+    """
+    Return the packed records of every layer in layers, solving them from
+    the last layer back, and reading those already saved in directory.
+    """
+    solved = [b''] * len(layers)
+    values = {}
+    for layer in reversed(range(len(layers))):
+        path = layer_path(side_length, layer, 'solved', directory)
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                solved[layer] = file.read()
+        else:
+            records = bytearray()
+            for key in layers[layer]:
+                value, move = solve_position(StonehengeState.from_key(key),
+                                             values)
+                records += RECORD.pack(key, value, move)
+            solved[layer] = bytes(records)
+            save(path, solved[layer])
+        values = {key: value for key, value, _
+                  in RECORD.iter_unpack(solved[layer])}
+    return solved
+
+
+def generate(side_length: int, directory: str = TABLEBASE_DIR) -> str:
+    """
+    Build the table of boards with side_length in directory, resuming from
+    any layers saved by an earlier run, and return its path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    layers = reachable_layers(side_length, directory)
+    solved = solve_layers(side_length, layers, directory)
+    records = sorted(record for data in solved
+                     for record in RECORD.iter_unpack(data))
+    data = bytearray(HEADER.pack(MAGIC, VERSION, side_length, len(records)))
+    for record in records:
+        data += RECORD.pack(*record)
+    path = table_path(side_length, directory)
+    save(path, bytes(data))
+    for layer in range(len(layers)):
+        for kind in ['keys', 'solved']:
+            os.remove(layer_path(side_length, layer, kind, directory))
+    return path
+
+
+class StonehengeTablebase:
+    """
+    A table of Stonehenge positions, read through mmap so that only the
+    pages a lookup touches are loaded.
+
+    side_length - the side length of the boards in this table
+    count - the number of positions in this table
+    data - the mapped contents of the table's file
+    """
+    side_length: int
+    count: int
+    data: mmap.mmap
+
+    def __init__(self, path: str) -> None:
+        """
+        Open the table in the file at path.
+
+        Raise ValueError if path does not hold a complete table.
+        """
+        with open(path, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.data) < HEADER.size:
+            self.data.close()
+            raise ValueError("{} is not a Stonehenge tablebase".format(path))
+        magic, version, self.side_length, self.count = \
+            HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION or \
+                len(self.data) != HEADER.size + self.count * RECORD.size:
+            self.data.close()
+            raise ValueError("{} is not a Stonehenge tablebase".format(path))
+
+    def __len__(self) -> int:
+        """
+        Return the number of positions in this table.
+        """
+        return self.count
+
+    def record(self, index: int) -> Tuple[int, int, int]:
+        """
+        Return the (key, value, move) of the record at index.
+        """
+        return RECORD.unpack_from(self.data, HEADER.size + index * RECORD.size)
+
+    def find(self, key: int) -> Optional[Tuple[int, int]]:
+        """
+        Return the (value, move) stored under key, or None if there is none.
+        """
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            found, value, move = self.record(middle)
+            if found == key:
+                return value, move
+            if found < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def probe(self, state: StonehengeState) -> Optional[Tuple[int, Any]]:
+        """
+        Return the value of state for its current player and a best move,
+        or None if state is not in this table.
+        """
+        if state.topology.side_length != self.side_length:
+            return None
+        key, symmetry = state.canonical()
+        found = self.find(key)
+        if found is None:
+            return None
+        value, move = found
+        if move == NO_MOVE:
+            return value, None
+        return value, state.original_move(state.topology.letters[move],
+                                          symmetry)
+
+    def close(self) -> None:
+        """
+        Unmap this table.
+        """
+        self.data.close()
+
+
+def load_tablebases(directory: str = TABLEBASE_DIR) -> Dict[int, Any]:
+    """
+    Return the tables found in directory, by side length.
+    """
+    tables = {}
+    for side_length in SIDE_LENGTHS:
+        path = table_path(side_length, directory)
+        if os.path.exists(path):
+            try:
+                tables[side_length] = StonehengeTablebase(path)
+            except ValueError:
+                continue
+    return tables
+
+
+# The tables mapped when this module is first imported.
+TABLEBASES = load_tablebases()
+
+
+def tablebase_move(state: Any) -> Any:
+    """
+    Return a best move for the current player of state from TABLEBASES, or
+    None if state is not a Stonehenge position in one of them.
+    """
+    if not isinstance(state, StonehengeState) or \
+            state.topology.side_length not in TABLEBASES:
+        return None
+    found = TABLEBASES[state.topology.side_length].probe(state)
+    return None if found is None else found[1]
+
+
+def search(state: StonehengeState, values: Dict[StonehengeState, int]) -> int:
+    """
+    Return the value of state for its current player by plain minimax,
+    remembering solved positions in values.
+    """
+    if state.winner() is not None:
+        return state.LOSE
+    if state not in values:
+        values[state] = max(-search(state.make_move(move), values)
+                            for move in state.get_possible_moves())
+    return values[state]
+
+
+def verify(side_length: int, samples: int = 200, seed: Any = 0,
+           directory: str = TABLEBASE_DIR) -> List[str]:
+    """
+    Return a description of every problem found in the table of boards with
+    side_length in directory, or an empty list if there are none.
+
+    Every record is checked to be sorted and consistent with the records of
+    its children, which together prove the whole table right; samples
+    random positions are also searched afresh without it.
+    """
+    table = StonehengeTablebase(table_path(side_length, directory))
+    problems = []
+    previous = -1
+    for index in range(len(table)):
+        key, value, move = table.record(index)
+        if key <= previous:
+            problems.append("key {} is out of order".format(key))
+        previous = key
+        state = StonehengeState.from_key(key)
+        if canonical_key(state) != key:
+            problems.append("{} is not canonical".format(key))
+        children = {}
+        for child_move in state.get_possible_moves():
+            found = table.find(canonical_key(state.make_move(child_move)))
+            if found is None:
+                problems.append("a child of {} is missing".format(key))
+            else:
+                children[state.topology.index[child_move]] = -found[0]
+        expected = max(children.values()) if children else state.LOSE
+        if value != expected or (children and children.get(move) != value):
+            problems.append("{} should have value {}".format(key, expected))
+    rng = random.Random(seed)
+    values = {}
+    for _ in range(min(samples, len(table))):
+        key, value, _ = table.record(rng.randrange(len(table)))
+        if search(StonehengeState.from_key(key), values) != value:
+            problems.append("search disagrees on {}".format(key))
+    table.close()
+    return problems
+
+
+if __name__ == "__main__":
+    COMMAND = sys.argv[1] if len(sys.argv) > 1 else 'generate'
+    for side in [int(arg) for arg in sys.argv[2:]] or SIDE_LENGTHS:
+        start = time.perf_counter()
+        if COMMAND == 'generate':
+            print("side {}: wrote {}".format(side, generate(side)), end='')
+        else:
+            print("side {}: {} problems".format(side, len(verify(side))),
+                  end='')
+        print(" in {:.1f}s".format(time.perf_counter() - start))
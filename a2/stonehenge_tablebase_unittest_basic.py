@@ -0,0 +1,157 @@
+"""
+Unittests for the Stonehenge endgame tablebase.
+
+Tables are built for the small boards in a temporary directory, so these
+do not depend on (or touch) any tables generated in tablebases/.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import stonehenge_tablebase
+import strategy
+from stonehenge import StonehengeGame, StonehengeState
+from stonehenge_tablebase import StonehengeTablebase, generate, \
+    reachable_layers, verify
+
+
+class StonehengeTablebaseUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_matches_search(self):
+        """
+        Test that every position of a side 2 board has the value a fresh
+        minimax search finds, and a move which keeps it.
+        """
+        table = StonehengeTablebase(generate(2, self.directory))
+        values = {}
+        # 4270 positions are reachable, but most come in mirror pairs.
+        self.assertEqual(len(table), 2150)
+        for index in range(len(table)):
+            key, _, _ = table.record(index)
+            state = StonehengeState.from_key(key)
+            value, move = table.probe(state)
+            self.assertEqual(value, stonehenge_tablebase.search(state,
+                                                                values))
+            if move is None:
+                self.assertIsNotNone(state.winner())
+            else:
+                self.assertEqual(table.probe(state.make_move(move))[0],
+                                 -value)
+        table.close()
+
+    def test_verify(self):
+        """
+        Test that verify passes a correct table and catches a wrong value.
+        """
+        path = generate(2, self.directory)
+        self.assertEqual(verify(2, directory=self.directory), [])
+        with open(path, 'r+b') as file:
+            offset = stonehenge_tablebase.HEADER.size + 100 * \
+                stonehenge_tablebase.RECORD.size
+            key, value, move = stonehenge_tablebase.RECORD.unpack(
+                file.read(offset + stonehenge_tablebase.RECORD.size)[offset:])
+            file.seek(offset)
+            file.write(stonehenge_tablebase.RECORD.pack(key, -value, move))
+        self.assertNotEqual(verify(2, directory=self.directory), [])
+
+    def test_resumes(self):
+        """
+        Test that a run resumed from saved layers builds the same table as
+        one run from scratch, and cleans up after itself.
+        """
+        with open(generate(2, self.directory), 'rb') as file:
+            expected = file.read()
+        os.remove(stonehenge_tablebase.table_path(2, self.directory))
+        # As if interrupted while solving back towards the empty board.
+        stonehenge_tablebase.solve_layers(
+            2, reachable_layers(2, self.directory), self.directory)
+        for layer in range(4):
+            os.remove(stonehenge_tablebase.layer_path(2, layer, 'solved',
+                                                      self.directory))
+        with open(generate(2, self.directory), 'rb') as file:
+            self.assertEqual(file.read(), expected)
+        self.assertEqual(os.listdir(self.directory), ['stonehenge_2.tb'])
+
+    def test_rejects_bad_files(self):
+        """
+        Test that a truncated table is refused rather than misread.
+        """
+        path = generate(1, self.directory)
+        with open(path, 'r+b') as file:
+            file.truncate(os.path.getsize(path) - 1)
+        self.assertRaises(ValueError, StonehengeTablebase, path)
+        self.assertEqual(stonehenge_tablebase.load_tablebases(
+            self.directory), {})
+
+    def test_strategies_consult_table(self):
+        """
+        Test that the minimax strategies answer from a loaded table without
+        searching.
+        """
+        tables = stonehenge_tablebase.load_tablebases(self.directory)
+        self.assertEqual(tables, {})
+        generate(2, self.directory)
+        tables = stonehenge_tablebase.load_tablebases(self.directory)
+        game = StonehengeGame(True, 2)
+        _, expected = tables[2].probe(game.current_state)
+        with patch.dict(stonehenge_tablebase.TABLEBASES, tables, clear=True):
+            for minimax in [strategy.recursive_minimax,
+                            strategy.iterative_minimax,
+                            strategy.recursive_alphabeta,
+                            strategy.iterative_alphabeta]:
+                strategy.TRANSPOSITION_TABLE.clear()
+                self.assertEqual(minimax(game), expected)
+                self.assertEqual(len(strategy.TRANSPOSITION_TABLE), 0)
+        tables[2].close()
+
+    def test_keys_round_trip(self):
+        """
+        Test that rebuilding a state from its key gives back an equal state
+        with the same hash and rendering.
+        """
+        state = StonehengeState(True, 3)
+        for move in ['A', 'F', 'K', 'B', 'L']:
+            state = state.make_move(move)
+            copy = StonehengeState.from_key(state.key())
+            self.assertEqual(copy, state)
+            self.assertEqual(hash(copy), hash(state))
+            self.assertEqual(str(copy), str(state))
+            self.assertEqual(copy.counters, state.counters)
+
+    def test_mirror_images_share_records(self):
+        """
+        Test that only one of each pair of mirror images is stored, and that
+        probing either gives moves of that position.
+        """
+        table = StonehengeTablebase(generate(2, self.directory))
+        for index in range(len(table)):
+            key, _, _ = table.record(index)
+            state = StonehengeState.from_key(key)
+            self.assertEqual(state.canonical()[0], key)
+            for symmetry in range(len(state.topology.symmetries)):
+                cells, lines = state.topology.symmetries[symmetry]
+                image = StonehengeState.from_masks(
+                    state.p1_turn, 2,
+                    [sum(1 << cells[i] for i in range(len(cells))
+                         if mask >> i & 1) for mask in state.cells],
+                    [sum(1 << lines[i] for i in range(len(lines))
+                         if mask >> i & 1) for mask in state.claims])
+                value, move = table.probe(image)
+                self.assertEqual(value, table.probe(state)[0])
+                if move is not None:
+                    self.assertIn(move, image.get_possible_moves())
+                    self.assertEqual(table.probe(image.make_move(move))[0],
+                                     -value)
+        table.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,267 @@
+"""
+Unittests for the internals of StonehengeState.
+
+These complement stonehenge_unittest_basic.py: instead of only checking
+what a player sees, they check the bookkeeping make_move keeps up to date.
+"""
+
+import random
+import unittest
+from unittest.mock import patch
+
+import stonehenge
+from game_interface import GameInterface
+from stonehenge import StonehengeGame, StonehengeState, get_topology
+from strategy import interactive_strategy
+from subtract_square_game import SubtractSquareGame
+from transposition_table import TranspositionTable
+
+
+def make_stonehenge(side_length, p1_starts=True):
+    """
+    Return a new StonehengeGame with side_length.
+    """
+    return StonehengeGame(p1_starts, side_length)
+
+
+def random_states(side_length, games=20, seed=0):
+    """
+    Yield every state of games random games on a board with side_length.
+    """
+    rng = random.Random(seed)
+    for _ in range(games):
+        state = StonehengeState(True, side_length)
+        yield state
+        while state.get_possible_moves():
+            state = state.make_move(rng.choice(state.get_possible_moves()))
+            yield state
+
+
+def turn(state, symmetry):
+    """
+    Return state turned by the symmetry at index symmetry of its topology.
+    """
+    cells, lines = state.topology.symmetries[symmetry]
+    return StonehengeState.from_masks(
+        state.p1_turn, state.topology.side_length,
+        [sum(1 << cells[i] for i in range(len(cells)) if mask >> i & 1)
+         for mask in state.cells],
+        [sum(1 << lines[i] for i in range(len(lines)) if mask >> i & 1)
+         for mask in state.claims])
+
+
+class ZobristUnitTests(unittest.TestCase):
+    def test_incremental_matches_scratch(self):
+        """
+        Test that the hash make_move keeps matches the hash worked out from
+        scratch, on boards of every side length.
+        """
+        for side_length in range(1, 6):
+            for state in random_states(side_length):
+                self.assertEqual(state.hash_value, state.compute_hash())
+
+    def test_transpositions_hash_equally(self):
+        """
+        Test that the same position reached by two move orders, and in two
+        different games, is equal and hashes equally.
+        """
+        state_1 = make_stonehenge(2).current_state
+        state_2 = make_stonehenge(2).current_state
+        # No ley-line here is raced for, so the claims do not depend on
+        # the order of the moves.
+        state_1 = state_1.make_move('A').make_move('D').make_move('G')
+        state_2 = state_2.make_move('G').make_move('D').make_move('A')
+        self.assertEqual(state_1, state_2)
+        self.assertEqual(hash(state_1), hash(state_2))
+        self.assertEqual(len({state_1, state_2}), 1)
+
+    def test_turn_changes_hash(self):
+        """
+        Test that the same board with a different player to move is a
+        different position.
+        """
+        state_1 = StonehengeState(True, 2)
+        state_2 = StonehengeState(False, 2)
+        self.assertNotEqual(state_1, state_2)
+        self.assertNotEqual(hash(state_1), hash(state_2))
+
+    def test_hashes_are_distinct(self):
+        """
+        Test that different positions seen in random games get different
+        hashes.
+        """
+        positions = {}
+        for state in random_states(3, games=200):
+            positions.setdefault(hash(state), set()).add(repr(state))
+        for reprs in positions.values():
+            self.assertEqual(len(reprs), 1)
+
+    def test_transposition_table_uses_canonical_key(self):
+        """
+        Test that the transposition table keys Stonehenge states on their
+        canonical key rather than their rendering, so mirror images share
+        one entry and get back the mirror image of the stored move.
+        """
+        table = TranspositionTable()
+        state = StonehengeState(True, 2).make_move('A')
+        mirror = StonehengeState(True, 2).make_move('G')
+        table.store(state, 1, 'B')
+        self.assertEqual(table.key(state), state.canonical()[0])
+        self.assertEqual(table.lookup_exact(
+            StonehengeState(True, 2).make_move('A')), (1, 'B'))
+        self.assertEqual(table.lookup_exact(mirror), (1, 'E'))
+        self.assertEqual(len(table), 1)
+
+
+class BitboardUnitTests(unittest.TestCase):
+    def test_masks_are_consistent(self):
+        """
+        Test that no cell or ley-line is held by both players, and that the
+        possible moves are exactly the unclaimed cells.
+        """
+        for side_length in range(1, 6):
+            for state in random_states(side_length):
+                self.assertEqual(state.cells[0] & state.cells[1], 0)
+                self.assertEqual(state.claims[0] & state.claims[1], 0)
+                if state.winner() is None:
+                    self.assertEqual(
+                        len(state.get_possible_moves()),
+                        len(state.topology.cell_bits) -
+                        bin(state.cells[0] | state.cells[1]).count('1'))
+
+    def test_winner_has_half_the_ley_lines(self):
+        """
+        Test that a game ends exactly when one player holds at least half
+        of the ley-lines, and that player is the one who just moved.
+        """
+        for state in random_states(3, games=50):
+            held = [bin(claims).count('1') for claims in state.claims]
+            over = max(held) * 2 >= len(state.topology.line_masks)
+            self.assertEqual(state.winner() is not None, over)
+            if over:
+                self.assertNotEqual(state.winner(),
+                                    state.get_current_player_name())
+
+    def test_counters_match_cells(self):
+        """
+        Test that the packed per-line counters and the count of held
+        ley-lines kept by make_move agree with the masks.
+        """
+        for side_length in range(1, 6):
+            topology = get_topology(side_length)
+            for state in random_states(side_length):
+                for player in range(2):
+                    for line in range(len(topology.line_masks)):
+                        self.assertEqual(
+                            state.counters[player] >>
+                            topology.line_shifts[line] & 255,
+                            bin(state.cells[player] &
+                                topology.line_masks[line]).count('1'))
+                    self.assertEqual(state.held[player],
+                                     bin(state.claims[player]).count('1'))
+
+
+class SymmetryUnitTests(unittest.TestCase):
+    def test_symmetries_preserve_play(self):
+        """
+        Test that turning a position by a symmetry and then moving gives
+        the same position as moving and then turning it.
+        """
+        for side_length in range(1, 6):
+            topology = get_topology(side_length)
+            for state in random_states(side_length, games=5):
+                for symmetry in range(len(topology.symmetries)):
+                    image = turn(state, symmetry)
+                    self.assertEqual(image.winner(), state.winner())
+                    self.assertEqual(image.canonical()[0],
+                                     state.canonical()[0])
+                    for move in state.get_possible_moves():
+                        self.assertEqual(
+                            turn(state.make_move(move), symmetry),
+                            image.make_move(
+                                state.canonical_move(move, symmetry)))
+
+    def test_canonical_is_kept(self):
+        """
+        Test that a state works out its canonical form once, and that the
+        states it moves to work out their own.
+        """
+        state = StonehengeState(True, 2).make_move('A')
+        form = state.canonical()
+        self.assertIs(state.canonical(), form)
+        child = state.make_move('B')
+        self.assertIsNone(child.canonical_form)
+        self.assertEqual(child.canonical(),
+                         StonehengeState.from_key(child.key()).canonical())
+
+    def test_moves_round_trip(self):
+        """
+        Test that original_move undoes canonical_move.
+        """
+        for side_length in range(1, 6):
+            state = StonehengeState(True, side_length)
+            for symmetry in range(len(state.topology.symmetries)):
+                for move in state.get_possible_moves() + [None]:
+                    self.assertEqual(state.original_move(
+                        state.canonical_move(move, symmetry), symmetry), move)
+
+
+class TopologyUnitTests(unittest.TestCase):
+    def test_shared_between_games(self):
+        """
+        Test that every state of one side length, in any game, shares one
+        topology.
+        """
+        state_1 = make_stonehenge(3).current_state
+        state_2 = make_stonehenge(3).current_state.make_move('A')
+        self.assertIs(state_1.topology, state_2.topology)
+        self.assertIs(stonehenge.TOPOLOGIES[3], state_1.topology)
+        self.assertIsNot(get_topology(2), state_1.topology)
+
+    def test_unsupported_sides(self):
+        """
+        Test that boards too small, or too large to name every cell with a
+        letter, are refused before anything is built.
+        """
+        for side_length in [0, 6, 10]:
+            with self.assertRaises(ValueError):
+                StonehengeState(True, side_length)
+            self.assertNotIn(side_length, stonehenge.TOPOLOGIES)
+
+    def test_families(self):
+        """
+        Test that each family of ley-lines covers every cell exactly once,
+        and that every cell is on one ley-line of each family.
+        """
+        for side_length in range(1, 6):
+            topology = get_topology(side_length)
+            for family in topology.families.values():
+                self.assertEqual(len(family), side_length + 1)
+                cells = sorted(sum([topology.line_cells[j] for j in family],
+                                   []))
+                self.assertEqual(cells, list(range(len(topology.cell_bits))))
+            for i in range(len(topology.cell_bits)):
+                self.assertEqual(len(topology.cell_lines[i]), 3)
+                for j in topology.cell_lines[i]:
+                    self.assertIn(i, topology.line_cells[j])
+
+
+class ConstructionUnitTests(unittest.TestCase):
+    @patch('builtins.input', side_effect=AssertionError("asked for input"))
+    def test_without_input(self, input):
+        """
+        Test that games and GameInterface ask nothing when they are given
+        the first player and the starting total or side length, or a game
+        already set up.
+        """
+        game = StonehengeGame(False, 2)
+        self.assertEqual(game.current_state, StonehengeState(False, 2))
+        state = SubtractSquareGame(True, 5).current_state
+        self.assertEqual(state.current_total, 5)
+        interface = GameInterface(game, interactive_strategy,
+                                  interactive_strategy, p1_starts=True)
+        self.assertIs(interface.game, game)
+
+
+if __name__ == "__main__":
+    unittest.main()
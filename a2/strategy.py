@@ -5,10 +5,18 @@ NOTE: Make sure this file adheres to python-ta.
 Adjust the type annotations as needed, and implement both a recursive
 and an iterative version of minimax.
 """
-import copy
-from typing import Any, List, Dict
+import atexit
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, List, Optional
 from game import Game
+from game_state import GameState
+from stonehenge_tablebase import tablebase_move
+from transposition_table import TranspositionTable
 
+# Positions solved by either minimax strategy, shared between them.
+TRANSPOSITION_TABLE = TranspositionTable()
 
 
 def interactive_strategy(game: Game) -> Any:
@@ -43,13 +51,14 @@ def rough_outcome_strategy(game: Any) -> Any:
     best_move = None
     best_outcome = -2  # Temporarily -- just so we can replace this easily later
 
-    # Get the move that results in the lowest rough_outcome for the opponent
-    for move in current_state.get_possible_moves():
-        new_state = current_state.make_move(move)
+    moves = current_state.get_possible_moves()
+    outcomes = current_state.child_rough_outcomes()
 
+    # Get the move that results in the lowest rough_outcome for the opponent
+    for move, outcome in zip(moves, outcomes):
         # We multiply the below by -1 since a state that's bad for the opponent
         # is good for us.
-        guessed_score = new_state.rough_outcome() * -1
+        guessed_score = outcome * -1
         if guessed_score > best_outcome:
             best_outcome = guessed_score
             best_move = move
@@ -58,100 +67,341 @@ def rough_outcome_strategy(game: Any) -> Any:
     return best_move
 
 
-def score(game: Game) -> int:
+def terminal_score(game: Game, state: GameState) -> int:
     """
-    Return the best score of the current player of the state.
+    Return the score of the current player of state, which is over.
     """
-    player = game.current_state.get_current_player_name()
+    player = state.get_current_player_name()
     if player == 'p1':
         other = 'p2'
     else:
         other = 'p1'
-    if game.is_over(game.current_state):
-        if game.is_winner(player):
-            return 1
-        if game.is_winner(other):
-            return -1
-        return 0
-    lst = []
-    for move in game.current_state.get_possible_moves():
-        new_game = copy.deepcopy(game)
-        new_game.current_state = game.current_state.make_move(move)
-        lst.append(new_game)
-    return max([-1 * score(new_game) for new_game in lst])
+    if game.is_winner_at(state, player):
+        return 1
+    if game.is_winner_at(state, other):
+        return -1
+    return 0
+
+
+def score(game: Game, state: GameState = None) -> int:
+    """
+    Return the best score of the current player of state, or of the game's
+    current state if state is not given.
+
+    Every solved position is remembered in TRANSPOSITION_TABLE, so a
+    position reached through several move orders is only searched once.
+    """
+    if state is None:
+        state = game.current_state
+    entry = TRANSPOSITION_TABLE.lookup_exact(state)
+    if entry is not None:
+        return entry[0]
+    if game.is_over(state):
+        return terminal_score(game, state)
+    best_score, best_move = -2, None
+    for move in state.get_possible_moves():
+        s = -1 * score(game, state.make_move(move))
+        if s > best_score:
+            best_score, best_move = s, move
+    TRANSPOSITION_TABLE.store(state, best_score, best_move)
+    return best_score
 
 
 def recursive_minimax(game: Game) -> Any:
     """
     Return a best move of the game for the current player to win through
     recursive minimax strategy.
+
+    Positions in an endgame tablebase are answered from it without
+    searching; so are those of the other minimax strategies below.
+    """
+    move = tablebase_move(game.current_state)
+    if move is not None:
+        return move
+    score(game)
+    return TRANSPOSITION_TABLE.lookup_exact(game.current_state)[1]
+
+
+def ordered_moves(state: GameState, first_move: Any = None) -> List[list]:
+    """
+    Return [move, new state] pairs for every possible move of state, with
+    the moves leaving the opponent the lowest rough_outcome() first.
+
+    If first_move is given (e.g. the best move found by an earlier search),
+    it is tried before all the others.
+    """
+    children = [[move, state.make_move(move)]
+                for move in state.get_possible_moves()]
+    children.sort(key=lambda child: child[1].rough_outcome())
+    for i in range(len(children)):
+        if children[i][0] == first_move:
+            children.insert(0, children.pop(i))
+            break
+    return children
+
+
+def probe(state: GameState, alpha: int, beta: int) -> List[Any]:
+    """
+    Return [value, best move, alpha, beta] for state from
+    TRANSPOSITION_TABLE.
+
+    value is None unless the stored entry already decides state within the
+    window (alpha, beta); otherwise alpha and beta are narrowed by whatever
+    bound is stored. best move is None if state has never been searched.
+    """
+    entry = TRANSPOSITION_TABLE.lookup(state)
+    if entry is None:
+        return [None, None, alpha, beta]
+    value, best_move, bound = entry
+    if bound == TranspositionTable.LOWER:
+        alpha = max(alpha, value)
+    elif bound == TranspositionTable.UPPER:
+        beta = min(beta, value)
+    if bound == TranspositionTable.EXACT or alpha >= beta:
+        return [value, best_move, alpha, beta]
+    return [None, best_move, alpha, beta]
+
+
+def record(state: GameState, value: int, best_move: Any, alpha: int,
+           beta: int) -> None:
     """
-    lst = []
-    for move in game.current_state.get_possible_moves():
-        new_game = copy.deepcopy(game)
-        new_game.current_state = game.current_state.make_move(move)
-        s = -1 * score(new_game)
-        lst.append([move, s])
-    for e in lst:
-        if e[1] == 1:
-            return e[0]
-    return lst[0][0]
+    Store in TRANSPOSITION_TABLE the value an alpha-beta search with window
+    (alpha, beta) found for state.
+    """
+    if value <= alpha:
+        bound = TranspositionTable.UPPER
+    elif value >= beta:
+        bound = TranspositionTable.LOWER
+    else:
+        bound = TranspositionTable.EXACT
+    TRANSPOSITION_TABLE.store(state, value, best_move, bound)
 
 
-# TODO: Implement an iterative version of the minimax strategy.
-class Tree:
+def alphabeta_score(game: Game, state: GameState = None, alpha: int = -1,
+                    beta: int = 1) -> int:
     """
-    A class which used to record the current game's score and its children.
+    Return the best score of the current player of state (by default the
+    game's current state), searching with alpha-beta pruning in the window
+    (alpha, beta).
 
-    game -  the game
-    score - the current game's score
-    childeren - the childeren of the current game
+    Moves are tried in the order given by ordered_moves(), and the search
+    stops looking at moves as soon as one reaching beta (with the default
+    window: a proven win) is found.
     """
-    game: Game
-    score: int
-    children: List['Tree']
+    if state is None:
+        state = game.current_state
+    if game.is_over(state):
+        return terminal_score(game, state)
+    value, best_move, low, high = probe(state, alpha, beta)
+    if value is not None:
+        return value
+    best_score = -2
+    for move, new_state in ordered_moves(state, best_move):
+        s = -1 * alphabeta_score(game, new_state, -high, -low)
+        if s > best_score:
+            best_score, best_move = s, move
+        low = max(low, s)
+        if low >= high:
+            break
+    record(state, best_score, best_move, alpha, beta)
+    return best_score
 
-    def __init__(self, game: Game, children: List['Tree'] = None) -> None:
+
+def recursive_alphabeta(game: Game) -> Any:
+    """
+    Return a best move of the game for the current player to win through
+    recursive minimax with alpha-beta pruning.
+    """
+    move = tablebase_move(game.current_state)
+    if move is not None:
+        return move
+    alphabeta_score(game)
+    return TRANSPOSITION_TABLE.lookup(game.current_state)[1]
+
+
+class Cancelled(Exception):
+    """
+    Raised when a search is stopped because its result is no longer
+    needed.
+    """
+    pass
+
+
+class FlatTree:
+    """
+    The part of a game tree an iterative search still needs, stored as
+    parallel lists indexed by node number rather than as objects.
+
+    Node 0 is the root. The children of a node are added next to each other
+    at the end of the lists, so when a node is finished its whole subtree
+    sits at the end and is freed by truncating the lists. The lists only
+    ever hold the nodes on the current path and their siblings, i.e. at most
+    depth * branching nodes.
+
+    parent - the index of each node's parent, or -1 for the root
+    first_child - the index of each node's first child, or -1 if the node
+                  has not been expanded
+    child_count - the number of children of each node
+    score - the best score found so far for each node's current player
+    move - the move which led to each node
+    best_move - the best move found so far from each node
+    state - the state of each node
+    alpha - the score each node's current player is already guaranteed
+    beta - the score above which the opponent will avoid each node
+    window - the (alpha, beta) each node was first asked to search in
+    """
+    parent: List[int]
+    first_child: List[int]
+    child_count: List[int]
+    score: List[int]
+    move: List[Any]
+    best_move: List[Any]
+    state: List[GameState]
+    alpha: List[int]
+    beta: List[int]
+    window: List[tuple]
+
+    def __init__(self, root: GameState, alpha: int = -1,
+                 beta: int = 1) -> None:
         """
-        Create Tree self as a contioner containing the state and the state's
-        score and the state's childeren.
+        Create a FlatTree holding only root, to be searched in the window
+        (alpha, beta).
         """
-        self.game = game
-        self.score = 0
-        self.children = children.copy() if children else []
+        self.parent, self.first_child, self.child_count = [], [], []
+        self.score, self.move, self.best_move = [], [], []
+        self.state, self.alpha, self.beta, self.window = [], [], [], []
+        self.add(-1, None, root)
+        self.open_window(0, alpha, beta)
 
+    def add(self, parent: int, move: Any, state: GameState) -> int:
+        """
+        Add state, reached by applying move to node parent, as a new node
+        and return its index.
+        """
+        self.parent.append(parent)
+        self.first_child.append(-1)
+        self.child_count.append(0)
+        self.score.append(-2)
+        self.move.append(move)
+        self.best_move.append(None)
+        self.state.append(state)
+        self.alpha.append(0)
+        self.beta.append(0)
+        self.window.append(None)
+        return len(self.parent) - 1
 
-def tree_score(game: Game, snd) -> int:
+    def open_window(self, node: int, alpha: int, beta: int) -> None:
+        """
+        Set the window (alpha, beta) node is to be searched in.
+        """
+        self.alpha[node], self.beta[node] = alpha, beta
+        self.window[node] = (alpha, beta)
+
+    def expand(self, node: int, children: List[list]) -> None:
+        """
+        Add the [move, state] pairs in children as the children of node.
+        """
+        self.first_child[node] = len(self.parent)
+        self.child_count[node] = len(children)
+        for move, state in children:
+            self.add(node, move, state)
+
+    def free_children(self, node: int) -> None:
+        """
+        Remove the children of the finished node, which are the last nodes
+        in the lists, along with anything below them.
+        """
+        first = self.first_child[node]
+        if first >= 0:
+            for column in [self.parent, self.first_child, self.child_count,
+                           self.score, self.move, self.best_move, self.state,
+                           self.alpha, self.beta, self.window]:
+                del column[first:]
+            self.first_child[node] = -1
+
+
+def flat_tree_score(game: Game, prune: bool, alpha: int = -1, beta: int = 1,
+                    stopped: Optional[Callable[[], bool]] = None) -> int:
     """
-    Return the best score of the current player of the current game.
+    Return the best score of the current player of the current game,
+    searching with an explicit FlatTree instead of recursion.
+
+    Nodes are scored in post-order, and each node's subtree is freed as soon
+    as the node is scored. If prune is True, children are tried in the
+    order of ordered_moves() with alpha-beta cutoffs in the window
+    (alpha, beta), and bounds are stored in TRANSPOSITION_TABLE; otherwise
+    every child is searched and only exact values are used.
+
+    If stopped is given, it is asked before each node is visited, and
+    Cancelled is raised once it returns True.
     """
-    tree = Tree(game)
-    stack = [tree]
-    while stack:
-        tree = stack.pop()
-        if tree.children == [] and \
-                (not tree.game.is_over(tree.game.current_state)):
-            stack.append(tree)
-            for move in tree.game.current_state.get_possible_moves():
-                new_game = copy.deepcopy(game)
-                new_game.current_state = tree.game.current_state.make_move(move)
-                tree.children.append(Tree(new_game))
-                stack.append(Tree(new_game))
-        elif tree.children == [] and tree.game.is_over(tree.game.current_state):
-            player = tree.game.current_state.get_current_player_name()
-            if player == 'p1':
-                other = 'p2'
+    tree = FlatTree(game.current_state, alpha, beta)
+    node = 0
+    while True:
+        if stopped is not None and stopped():
+            raise Cancelled
+        state = tree.state[node]
+        children = None
+        if game.is_over(state):
+            tree.score[node] = terminal_score(game, state)
+        elif prune:
+            value, best_move, tree.alpha[node], tree.beta[node] = probe(
+                state, tree.alpha[node], tree.beta[node])
+            if value is None:
+                children = ordered_moves(state, best_move)
+            else:
+                tree.score[node] = value
+        else:
+            entry = TRANSPOSITION_TABLE.lookup_exact(state)
+            if entry is None:
+                children = [[move, state.make_move(move)]
+                            for move in state.get_possible_moves()]
             else:
-                other = 'p1'
-            if game.is_winner(player):
-                tree.score = 1
-            if game.is_winner(other):
-                tree.score = -1
+                tree.score[node] = entry[0]
+        if children:
+            tree.expand(node, children)
+            child = tree.first_child[node]
+            tree.open_window(child, -tree.beta[node], -tree.alpha[node])
+            node = child
+            continue
+
+        # node is scored: pass its score up until a parent has another
+        # child left to search.
+        while node > 0:
+            parent = tree.parent[node]
+            s = -1 * tree.score[node]
+            if s > tree.score[parent]:
+                tree.score[parent] = s
+                tree.best_move[parent] = tree.move[node]
+            if prune:
+                tree.alpha[parent] = max(tree.alpha[parent], s)
+            tree.free_children(node)
+            last = tree.first_child[parent] + tree.child_count[parent] - 1
+            if node < last and tree.alpha[parent] < tree.beta[parent]:
+                node += 1
+                tree.open_window(node, -tree.beta[parent],
+                                 -tree.alpha[parent])
+                break
+            node = parent
+            if prune:
+                record(tree.state[node], tree.score[node],
+                       tree.best_move[node], tree.window[node][0],
+                       tree.window[node][1])
             else:
-                tree.score = 0
+                TRANSPOSITION_TABLE.store(tree.state[node], tree.score[node],
+                                          tree.best_move[node])
         else:
-            tree.score = max([-1 * child.score for child in tree.children])
-    return tree.score
+            return tree.score[0]
+
+
+def tree_score(game: Game) -> int:
+    """
+    Return the best score of the current player of the current game.
+
+    Positions already in TRANSPOSITION_TABLE are not expanded again, and
+    every position solved here is stored there for later searches.
+    """
+    return flat_tree_score(game, False)
 
 
 def iterative_minimax(game: Game) -> Any:
@@ -159,16 +409,226 @@ def iterative_minimax(game: Game) -> Any:
     Return a best move of the game for the current player to win
     through iterative minimax strategy.
     """
-    lst = []
-    for move in game.current_state.get_possible_moves():
-        new_game = copy.deepcopy(game)
-        new_game.current_state = game.current_state.make_move(move)
-        s = -1 * tree_score(new_game)
-        lst.append([move, s])
-    for e in lst:
-        if e[1] == 1:
-            return e[0]
-    return lst[0][0]
+    move = tablebase_move(game.current_state)
+    if move is not None:
+        return move
+    tree_score(game)
+    return TRANSPOSITION_TABLE.lookup_exact(game.current_state)[1]
+
+
+def alphabeta_tree_score(game: Game) -> int:
+    """
+    Return the best score of the current player of the current game,
+    searching with alpha-beta pruning and an explicit stack instead of
+    recursion.
+    """
+    return flat_tree_score(game, True)
+
+
+def iterative_alphabeta(game: Game) -> Any:
+    """
+    Return a best move of the game for the current player to win through
+    iterative minimax with alpha-beta pruning.
+    """
+    move = tablebase_move(game.current_state)
+    if move is not None:
+        return move
+    alphabeta_tree_score(game)
+    return TRANSPOSITION_TABLE.lookup(game.current_state)[1]
+
+
+# The worker pool parallel_minimax hands root moves to, with the numbers
+# it shares with its workers: started the first time it is needed, and shut
+# down by shutdown_pool(), at the latest when the interpreter exits.
+POOL = {}
+
+# The number of worker processes in POOL; None for one per CPU.
+WORKERS = None
+
+# In a worker process: the shared numbers of the pool it belongs to.
+WORKER = {}
+
+
+def start_worker(search: Any, alpha: Any) -> None:
+    """
+    Keep search and alpha, shared with the process running parallel_minimax,
+    for the subtrees this worker process will solve.
+    """
+    WORKER['search'] = search
+    WORKER['alpha'] = alpha
+
+
+def get_pool() -> dict:
+    """
+    Return POOL, starting its worker processes if they are not running.
+
+    POOL holds the 'executor', the number of the 'search' parallel_minimax
+    is running (a subtree of any other search is dropped as soon as its
+    worker notices), and the best score 'alpha' that search has found so
+    far.
+    """
+    if not POOL:
+        search = multiprocessing.RawValue('q', 0)
+        alpha = multiprocessing.RawValue('b', GameState.LOSE)
+        POOL['executor'] = ProcessPoolExecutor(WORKERS,
+                                               initializer=start_worker,
+                                               initargs=(search, alpha))
+        POOL['search'], POOL['alpha'] = search, alpha
+        atexit.register(shutdown_pool)
+    return POOL
+
+
+def shutdown_pool() -> None:
+    """
+    Stop the subtrees being solved by the workers of POOL, and shut them
+    down. The next parallel_minimax starts new ones.
+    """
+    if POOL:
+        POOL['search'].value += 1
+        POOL['executor'].shutdown(cancel_futures=True)
+        POOL.clear()
+
+
+def solve_subtree(game_class: type, state: GameState,
+                  search: int) -> Optional[int]:
+    """
+    Return the best score of the current player of state, a child of the
+    root of search, or None if search is over before it is solved.
+
+    This runs in a worker process, which gets only state and the class of
+    the game: a game is only used through is_over and is_winner_at, which
+    look at the state they are given. The subtree is searched in the window
+    left by the best score found for the root so far, and each worker keeps
+    its own TRANSPOSITION_TABLE between calls.
+    """
+    alpha = WORKER['alpha'].value
+    if WORKER['search'].value != search or alpha >= GameState.WIN:
+        return None
+    game = game_class.__new__(game_class)
+    game.current_state = state
+    try:
+        return flat_tree_score(game, True, -GameState.WIN, -alpha,
+                               lambda: WORKER['search'].value != search)
+    except Cancelled:
+        return None
+
+
+def parallel_minimax(game: Game) -> Any:
+    """
+    Return a best move of the game for the current player to win, solving
+    the states after each possible move in parallel worker processes.
+
+    Moves are handed out in the order of ordered_moves(). Each subtree is
+    searched with alpha-beta in the window left by the best score found so
+    far, so it only proves what could change the answer. Once a move is
+    proven to win, the moves not started yet are cancelled and those being
+    searched stop at their next position.
+    """
+    move = tablebase_move(game.current_state)
+    if move is not None:
+        return move
+    pool = get_pool()
+    pool['search'].value += 1
+    pool['alpha'].value = GameState.LOSE
+    search = pool['search'].value
+    children = ordered_moves(game.current_state)
+    futures = {pool['executor'].submit(solve_subtree, type(game), new_state,
+                                       search): move
+               for move, new_state in children}
+    best_score, best_move = -2, children[0][0]
+    try:
+        for future in as_completed(futures):
+            result = future.result()
+            if result is None:
+                continue
+            s = -1 * result
+            if s > best_score:
+                best_score, best_move = s, futures[future]
+                pool['alpha'].value = max(pool['alpha'].value, s)
+            if s == GameState.WIN:
+                break
+    finally:
+        pool['search'].value += 1
+        for pending in futures:
+            pending.cancel()
+    return best_move
+
+
+# The number of seconds iterative_deepening spends on a move by default.
+TIME_LIMIT = 1.0
+
+
+class OutOfTime(Exception):
+    """
+    Raised when a depth-limited search runs past its deadline.
+    """
+    pass
+
+
+def depth_limited_score(game: Game, state: GameState, depth: int,
+                        alpha: float, beta: float, search: dict) -> float:
+    """
+    Return the score of the current player of state, looking depth moves
+    ahead with alpha-beta pruning in the window (alpha, beta) and using
+    rough_outcome() for the states depth moves away.
+
+    search holds the deadline (a time.perf_counter() value), whether any
+    state was cut off by depth so far ('cut off'), and the best move found
+    from each state so far ('best moves', keyed on repr), which is tried
+    first and updated here.
+
+    Raise OutOfTime once the deadline has passed.
+    """
+    if time.perf_counter() > search['deadline']:
+        raise OutOfTime
+    if game.is_over(state):
+        return terminal_score(game, state)
+    if depth == 0:
+        search['cut off'] = True
+        return state.rough_outcome()
+    key = repr(state)
+    if depth == 1:
+        children = [[move, state.make_move(move)]
+                    for move in state.get_possible_moves()]
+    else:
+        children = ordered_moves(state, search['best moves'].get(key))
+    best_score, best_move = -2, None
+    for move, new_state in children:
+        s = -1 * depth_limited_score(game, new_state, depth - 1, -beta,
+                                     -alpha, search)
+        if s > best_score:
+            best_score, best_move = s, move
+        alpha = max(alpha, s)
+        if alpha >= beta:
+            break
+    search['best moves'][key] = best_move
+    return best_score
+
+
+def iterative_deepening(game: Game, time_limit: float = TIME_LIMIT) -> Any:
+    """
+    Return a best move of the game for the current player, found by
+    searching 1, 2, 3, ... moves ahead until time_limit seconds are up.
+
+    The move from the deepest search that finished is returned. The search
+    stops early once it proves a win or a loss, or once it sees every game
+    through to the end.
+    """
+    state = game.current_state
+    search = {'deadline': time.perf_counter() + time_limit,
+              'best moves': {}}
+    best_move = state.get_possible_moves()[0]
+    depth = 1
+    while True:
+        search['cut off'] = False
+        try:
+            value = depth_limited_score(game, state, depth, -1, 1, search)
+        except OutOfTime:
+            return best_move
+        best_move = search['best moves'][repr(state)]
+        if abs(value) == 1 or not search['cut off']:
+            return best_move
+        depth += 1
 
 
 if __name__ == "__main__":
@@ -0,0 +1,51 @@
+"""
+Compare how many SubtractSquare totals per second the pure-Python solver
+and the NumPy sieve can solve.
+
+Run it from this directory:  python subtract_square_benchmark.py [limit ...]
+
+NOTE: You do not have to run python-ta on this file.
+"""
+import sys
+import time
+from typing import Callable, List
+
+from subtract_square_sieve import PackedLosingTotals
+from subtract_square_solver import SubtractSquareSolver
+
+DEFAULT_LIMITS = [10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+# The pure-Python solver takes minutes past this, so it is skipped there.
+PYTHON_LIMIT = 10 ** 7
+
+ENGINES = [('python', SubtractSquareSolver, PYTHON_LIMIT),
+           ('numpy', PackedLosingTotals, 10 ** 9)]
+
+
+def time_engine(engine: Callable, limit: int) -> float:
+    """
+    Return how many seconds engine takes to solve every total up to limit.
+    """
+    start = time.perf_counter()
+    engine(limit)
+    return time.perf_counter() - start
+
+
+def main(limits: List[int]) -> None:
+    """
+    Print a table of seconds taken and totals solved per second by each
+    engine for each limit in limits.
+    """
+    print("{:>12}{:>10}{:>12}{:>16}".format('limit', 'engine', 'seconds',
+                                            'totals/second'))
+    for limit in limits:
+        for name, engine, largest in ENGINES:
+            if limit > largest:
+                continue
+            elapsed = time_engine(engine, limit)
+            print("{:>12}{:>10}{:>12.3f}{:>16.0f}".format(
+                limit, name, elapsed, limit / elapsed))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_LIMITS)
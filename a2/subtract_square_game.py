@@ -4,7 +4,7 @@ An implementation of Subtract Square.
 NOTE: You do not have to run python-ta on this file.
 """
 from game import Game
-from subtract_square_state import SubtractSquareState
+from subtract_square_state import intern_state
 
 
 class SubtractSquareGame(Game):
@@ -12,16 +12,19 @@ class SubtractSquareGame(Game):
     Abstract class for a game to be played with two players.
     """
 
-    def __init__(self, p1_starts):
+    def __init__(self, p1_starts, count=None):
         """
         Initialize this Game, using p1_starts to find who the first player is.
 
         :param p1_starts: A boolean representing whether Player 1 is the first
                           to make a move.
         :type p1_starts: bool
+        :param count: The number to subtract from, or None to ask the user.
+        :type count: int
         """
-        count = int(input("Enter the number to subtract from: "))
-        self.current_state = SubtractSquareState(p1_starts, count)
+        if count is None:
+            count = int(input("Enter the number to subtract from: "))
+        self.current_state = intern_state(p1_starts, count)
 
     def get_instructions(self):
         """
@@ -54,8 +57,23 @@ class SubtractSquareGame(Game):
         :return: Whether player has won or not.
         :rtype: bool
         """
-        return (self.current_state.get_current_player_name() != player
-                and self.is_over(self.current_state))
+        return self.is_winner_at(self.current_state, player)
+
+    def is_winner_at(self, state, player):
+        """
+        Return whether player has won the game at state.
+
+        Precondition: player is 'p1' or 'p2'.
+
+        :param state: The state to check.
+        :type state: CompactSubtractSquareState
+        :param player: The player to check.
+        :type player: str
+        :return: Whether player has won at state or not.
+        :rtype: bool
+        """
+        return state.get_current_player_name() != player and \
+            self.is_over(state)
 
     def str_to_move(self, string):
         """
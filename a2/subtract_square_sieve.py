@@ -0,0 +1,189 @@
+"""
+A NumPy sieve for the losing totals of SubtractSquare.
+
+This solves the same table as subtract_square_solver.py, but marks the
+totals won by each block of losing totals in one vectorized NumPy pass
+instead of Python loops, and keeps the result packed eight totals to a
+byte. It needs numpy.
+
+NOTE: You do not have to run python-ta on this file.
+"""
+import struct
+from math import isqrt
+from typing import Any
+
+import numpy as np
+
+from subtract_square_solver import state_total
+
+
+# The number of totals losing_mask decides before marking what they win.
+BLOCK = 4096
+
+# A saved table is this header (MAGIC and the limit) followed by the packed
+# totals.
+HEADER = struct.Struct('<4sQ')
+MAGIC = b'SQLT'
+
+
+def losing_mask(limit: int) -> np.ndarray:
+    """
+    Return a boolean array whose entry n is True exactly when the player to
+    move from total n, for n up to limit, loses.
+
+    Totals are decided BLOCK at a time. Whether a total is lost depends on
+    the totals just below it, so the losses of a block are found in order,
+    each marking only the few totals of the block it wins. Then every total
+    a square above any of them is marked as won in one vectorized pass over
+    all of the block's losses at once.
+
+    >>> np.flatnonzero(losing_mask(20)).tolist()
+    [0, 2, 5, 7, 10, 12, 15, 17, 20]
+    """
+    squares = np.arange(1, isqrt(limit) + 1, dtype=np.int64) ** 2
+    near = squares[:isqrt(BLOCK - 1)]
+    # Room past limit for the marks of a block's last losses, so they need
+    # not be filtered out.
+    won = np.zeros(limit + BLOCK, dtype=bool)
+    for start in range(0, limit + 1, BLOCK):
+        block = won[start:min(start + BLOCK, limit + 1)]
+        losses = []
+        first = int(block.argmin())
+        while not block[first]:
+            losses.append(start + first)
+            block[first + near[:isqrt(len(block) - 1 - first)]] = True
+            first += int(block[first:].argmin())
+        if losses:
+            won[np.add.outer(np.array(losses, dtype=np.int64),
+                             squares[:isqrt(limit - start)])] = True
+    return ~won[:limit + 1]
+
+
+class PackedLosingTotals:
+    """
+    The losing totals of SubtractSquare up to some limit, packed one bit per
+    total (least significant bit first).
+
+    limit - the largest total covered
+    bits - bit n of the packed array is 1 exactly when total n is lost
+    squares - every square no larger than limit, in increasing order
+    """
+    limit: int
+    bits: np.ndarray
+    squares: np.ndarray
+
+    def __init__(self, limit: int, bits: np.ndarray = None) -> None:
+        """
+        Initialize the PackedLosingTotals up to limit, sieving them unless
+        already packed bits are given.
+        """
+        self.limit = limit
+        if bits is None:
+            bits = np.packbits(losing_mask(limit), bitorder='little')
+        self.bits = bits
+        self.squares = np.arange(1, isqrt(limit) + 1, dtype=np.int64) ** 2
+
+    def __len__(self) -> int:
+        """
+        Return the number of bytes the packed totals take.
+        """
+        return self.bits.nbytes
+
+    def is_loss(self, total: int) -> bool:
+        """
+        Return whether the player to move from total loses.
+
+        Precondition: 0 <= total <= self.limit
+
+        >>> table = PackedLosingTotals(20)
+        >>> table.is_loss(17), table.is_loss(18)
+        (True, False)
+        """
+        return bool((self.bits[total >> 3] >> (total & 7)) & 1)
+
+    def winning_square(self, total: int) -> int:
+        """
+        Return the smallest square whose subtraction from total leaves the
+        opponent a lost total, or 0 if there is none.
+
+        Precondition: 0 <= total <= self.limit
+
+        >>> PackedLosingTotals(20).winning_square(18)
+        1
+        """
+        left = total - self.squares[:isqrt(total)]
+        lost = (self.bits[left >> 3] >> (left & 7)) & 1
+        first = int(lost.argmax()) if lost.size else 0
+        if lost.size and lost[first]:
+            return int(self.squares[first])
+        return 0
+
+    def save(self, path: str) -> None:
+        """
+        Write the limit and packed totals to the file at path.
+        """
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, self.limit))
+            file.write(self.bits.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'PackedLosingTotals':
+        """
+        Return the PackedLosingTotals saved at path.
+
+        Raise ValueError if the file is not a saved table, or does not hold
+        exactly the totals up to the limit it was saved with.
+        """
+        with open(path, 'rb') as file:
+            data = file.read()
+        if len(data) < HEADER.size:
+            raise ValueError("{} is too short to be a table".format(path))
+        magic, limit = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("{} is not a table".format(path))
+        if len(data) - HEADER.size != limit // 8 + 1:
+            raise ValueError("{} should hold {} bytes of totals, not {}"
+                             .format(path, limit // 8 + 1,
+                                     len(data) - HEADER.size))
+        return cls(limit, np.frombuffer(data, dtype=np.uint8,
+                                        offset=HEADER.size))
+
+
+# The totals sieved so far, shared by every game: sieved the first time a
+# game asks, and again to twice the size when a larger total shows up.
+TABLE = []
+
+# The smallest table shared_table sieves.
+FIRST_LIMIT = 1 << 16
+
+
+def shared_table(total: int) -> PackedLosingTotals:
+    """
+    Return TABLE's table, sieving a new one first if there is none yet or
+    it does not reach total.
+    """
+    if not TABLE or total > TABLE[0].limit:
+        limit = max(total, FIRST_LIMIT, 2 * TABLE[0].limit if TABLE else 0)
+        TABLE[:] = [PackedLosingTotals(limit)]
+    return TABLE[0]
+
+
+def sieve_strategy(game: Any) -> Any:
+    """
+    Return a best move for a game of SubtractSquare by looking it up in the
+    shared packed table; if every move loses, subtract 1.
+
+    Precondition: game.current_state is a SubtractState or a
+    SubtractSquareState.
+    """
+    state = game.current_state
+    total = state_total(state)
+    square = shared_table(total).winning_square(total) or 1
+    if hasattr(state, 'current_val'):
+        return str(square)
+    return square
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,154 @@
+"""
+A bottom-up solver for SubtractSquare.
+
+Whether the player to move wins SubtractSquare depends only on the current
+total, so instead of searching a game tree this fills in a table of wins
+and losses for every total up to some limit, once.
+
+The solver reads the total from either a1's SubtractState (current_val,
+string moves) or a2's SubtractSquareState (current_total, integer moves),
+and answers in the same move format as the state it is given.
+
+NOTE: You do not have to run python-ta on this file.
+"""
+from itertools import islice
+from math import isqrt
+from typing import Any, List
+
+
+class SubtractSquareSolver:
+    """
+    A table of which SubtractSquare totals are won by the player to move.
+
+    A total is lost exactly when every square that can be subtracted from it
+    leaves a total that is won, so the table is filled in one pass upwards:
+    each total not yet known to be won is a loss, and every total a square
+    above a loss is a win.
+
+    wins - wins[n] is 1 if the player to move from total n can force a win
+    losses - every total up to the limit of wins that is lost, in order
+    """
+    wins: bytearray
+    losses: List[int]
+
+    def __init__(self, limit: int = 0) -> None:
+        """
+        Initialize a SubtractSquareSolver with every total up to limit
+        solved.
+        """
+        self.wins = bytearray(1)
+        self.losses = [0]
+        self.extend(limit)
+
+    def limit(self) -> int:
+        """
+        Return the largest total solved so far.
+        """
+        return len(self.wins) - 1
+
+    def extend(self, limit: int) -> None:
+        """
+        Solve every total up to limit.
+
+        This takes O(limit + L * sqrt(limit)) steps for the L lost totals,
+        and totals already solved are not solved again.
+        """
+        old_limit = self.limit()
+        if limit <= old_limit:
+            return
+        wins = self.wins
+        wins.extend(bytes(limit - old_limit))
+        squares = [k * k for k in range(1, isqrt(limit) + 1)]
+        # Totals a square above an already known loss may lie past the old
+        # limit, so mark those first.
+        for loss in self.losses:
+            for square in islice(squares, isqrt(old_limit - loss),
+                                 isqrt(limit - loss)):
+                wins[loss + square] = 1
+        for total in range(old_limit + 1, limit + 1):
+            if not wins[total]:
+                self.losses.append(total)
+                for square in islice(squares, isqrt(limit - total)):
+                    wins[total + square] = 1
+
+    def is_win(self, total: int) -> bool:
+        """
+        Return whether the player to move from total can force a win.
+
+        >>> solver = SubtractSquareSolver()
+        >>> [n for n in range(21) if not solver.is_win(n)]
+        [0, 2, 5, 7, 10, 12, 15, 17, 20]
+        """
+        if total > self.limit():
+            # Grow geometrically so a game played downwards from a huge
+            # total, or many nearby totals, only pay for one pass.
+            self.extend(max(total, 2 * self.limit()))
+        return self.wins[total] == 1
+
+    def winning_square(self, total: int) -> int:
+        """
+        Return a square whose subtraction from total leaves the opponent in
+        a lost position, or 0 if there is none.
+
+        This looks at the O(sqrt(total)) squares no larger than total.
+
+        >>> SubtractSquareSolver().winning_square(18)
+        1
+        >>> SubtractSquareSolver().winning_square(20)
+        0
+        """
+        if not self.is_win(total):
+            return 0
+        wins = self.wins
+        for k in range(1, isqrt(total) + 1):
+            if not wins[total - k * k]:
+                return k * k
+        return 0
+
+    def best_move(self, state: Any) -> Any:
+        """
+        Return a best move for the current player of state, a SubtractState
+        or SubtractSquareState that is not over, in that state's move format.
+
+        If every move loses, the smallest square is returned so the game
+        lasts as long as possible. A state which keeps its own solved_value
+        (as the interned states of a SubtractSquareGame do) is asked whether
+        it is lost, so the squares are only tried from a won position.
+        """
+        total = state_total(state)
+        square = 1
+        if not hasattr(state, 'solved_value') or \
+                state.solved_value() == state.WIN:
+            square = self.winning_square(total) or 1
+        if hasattr(state, 'current_val'):
+            return str(square)
+        return square
+
+
+def state_total(state: Any) -> int:
+    """
+    Return the current total of a SubtractState or SubtractSquareState.
+    """
+    if hasattr(state, 'current_total'):
+        return state.current_total
+    return state.current_val
+
+
+# One table shared by every game, grown as larger totals show up.
+SOLVER = SubtractSquareSolver()
+
+
+def solved_strategy(game: Any) -> Any:
+    """
+    Return a best move for a game of SubtractSquare, by looking it up in
+    the shared table instead of searching.
+
+    Precondition: game.current_state is a SubtractState or a
+    SubtractSquareState.
+    """
+    return SOLVER.best_move(game.current_state)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,115 @@
+"""
+Unittests for the SubtractSquare solvers.
+
+The solvers are checked against minimax, which is slow but obviously
+right, on small totals.
+"""
+
+import unittest
+
+import strategy
+from subtract_square_game import SubtractSquareGame
+from subtract_square_solver import SubtractSquareSolver, solved_strategy
+from subtract_square_state import SubtractSquareState
+
+try:
+    import subtract_square_sieve
+except ImportError:
+    subtract_square_sieve = None
+
+MINIMAX_LIMIT = 120
+
+
+class SubtractSquareSolverUnitTests(unittest.TestCase):
+    def test_matches_minimax(self):
+        """
+        Test that the solver agrees with minimax on every total up to
+        MINIMAX_LIMIT.
+        """
+        solver = SubtractSquareSolver(MINIMAX_LIMIT)
+        strategy.TRANSPOSITION_TABLE.clear()
+        game = SubtractSquareGame(True, 1)
+        for total in range(1, MINIMAX_LIMIT + 1):
+            value = strategy.score(game, SubtractSquareState(True, total))
+            self.assertEqual(solver.is_win(total), value == 1,
+                             "Wrong result for a total of {}.".format(total))
+
+    def test_extending_matches_solving_at_once(self):
+        """
+        Test that growing the table bit by bit gives the same table as
+        filling it in one go.
+        """
+        solver = SubtractSquareSolver()
+        for limit in range(0, 2000, 37):
+            solver.extend(limit)
+        self.assertEqual(solver.wins,
+                         SubtractSquareSolver(solver.limit()).wins)
+
+    def test_winning_square_wins(self):
+        """
+        Test that winning_square always leaves the opponent a lost total.
+        """
+        solver = SubtractSquareSolver(5000)
+        for total in range(1, 5001):
+            square = solver.winning_square(total)
+            if solver.is_win(total):
+                self.assertFalse(solver.is_win(total - square))
+            else:
+                self.assertEqual(square, 0)
+
+    def test_strategy_move_format(self):
+        """
+        Test that solved_strategy answers with the integer moves of
+        SubtractSquareState, and the string moves of a1's SubtractState.
+        """
+        game = SubtractSquareGame(True, 18)
+        self.assertEqual(solved_strategy(game), 1)
+
+        class SubtractState:
+            def __init__(self, current_val):
+                self.current_val = current_val
+
+        self.assertEqual(SubtractSquareSolver().best_move(SubtractState(18)),
+                         '1')
+
+
+@unittest.skipIf(subtract_square_sieve is None, "numpy is not installed")
+class SubtractSquareSieveUnitTests(unittest.TestCase):
+    def test_matches_solver(self):
+        """
+        Test that the sieve finds the same losing totals as the pure-Python
+        solver.
+        """
+        limit = 50000
+        solver = SubtractSquareSolver(limit)
+        mask = subtract_square_sieve.losing_mask(limit)
+        self.assertEqual(mask.nonzero()[0].tolist(), solver.losses)
+
+    def test_packed_lookups(self):
+        """
+        Test that the packed table answers is_loss and winning_square like
+        the pure-Python solver.
+        """
+        limit = 5000
+        solver = SubtractSquareSolver(limit)
+        table = subtract_square_sieve.PackedLosingTotals(limit)
+        self.assertEqual(len(table), limit // 8 + 1)
+        for total in range(limit + 1):
+            self.assertEqual(table.is_loss(total), not solver.is_win(total))
+            self.assertEqual(table.winning_square(total),
+                             solver.winning_square(total))
+
+    def test_strategy_grows_table(self):
+        """
+        Test that sieve_strategy handles totals beyond the shared table.
+        """
+        total = subtract_square_sieve.TABLE.limit + 3
+        game = SubtractSquareGame(True, total)
+        move = subtract_square_sieve.sieve_strategy(game)
+        self.assertEqual(move, SubtractSquareSolver().best_move(
+            game.current_state))
+        self.assertGreaterEqual(subtract_square_sieve.TABLE.limit, total)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,13 +3,23 @@ An implementation of a state for SubtractSquare.
 
 NOTE: You do not have to run python-ta on this file.
 """
-from typing import Any
+from math import isqrt
+from typing import Any, Dict, List, Optional, Tuple
 from game_state import GameState
+from subtract_square_solver import SOLVER
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class SubtractSquareState(GameState):
     """
     The state of a game at a certain point in time.
+
+    SubtractSquareGame plays on CompactSubtractSquareState; this mutable
+    version is what it is checked against.
     """
 
     def __init__(self, is_p1_turn: bool, current_total: int) -> None:
@@ -30,12 +40,15 @@ class SubtractSquareState(GameState):
         """
         Return all possible moves that can be applied to this state.
         """
-        moves = []
-        for i in range(1, self.current_total + 1):
-            if i ** 2 <= self.current_total:
-                moves.append(i ** 2)
+        return squares_up_to(self.current_total)
 
-        return moves
+    def is_valid_move(self, move: Any) -> bool:
+        """
+        Return whether move is a valid move for this GameState, without
+        listing the possible moves.
+        """
+        return isinstance(move, int) and 0 < move <= self.current_total \
+            and isqrt(move) ** 2 == move
 
     def make_move(self, move: Any) -> "SubtractSquareState":
         """
@@ -61,14 +74,156 @@ class SubtractSquareState(GameState):
         Return an estimate in interval [LOSE, WIN] of best outcome the current
         player can guarantee from state self.
         """
-        if is_pos_square(self.current_total):
-            return self.WIN
-        elif all([is_pos_square(self.current_total - n ** 2)
-                  for n in range(1, self.current_total + 1)
-                  if n ** 2 < self.current_total]):
-            return self.LOSE
+        return rough_outcome_of(self.current_total, ROUGH_OUTCOME_CACHE)
+
+    def child_rough_outcomes(self) -> list:
+        """
+        Return the rough_outcome() of the state each possible move leads
+        to, in the order of get_possible_moves(), working them all out
+        together.
+        """
+        return child_rough_outcomes_of(self.current_total)
+
+
+class CompactSubtractSquareState(GameState):
+    """
+    An immutable SubtractSquareState, which keeps its fields in __slots__
+    rather than a __dict__ so that searches creating many of them use less
+    memory. It can be hashed, and equal states hash equally.
+
+    States got from intern_state(), and so every state make_move returns,
+    are shared: there is one per (p1_turn, current_total), and whatever it
+    works out about itself is kept for the next time it is reached.
+
+    p1_turn - whether it is p1's turn or not
+    current_total - the number left to subtract from
+    moves - the possible moves, or None until they are first asked for
+    value - WIN or LOSE for the current player, or None until it is first
+            asked for
+    """
+    __slots__ = ('p1_turn', 'current_total', 'moves', 'value')
+    current_total: int
+    moves: Optional[Tuple[int, ...]]
+    value: Optional[int]
+
+    __str__ = SubtractSquareState.__str__
+    __repr__ = SubtractSquareState.__repr__
+    is_valid_move = SubtractSquareState.is_valid_move
+    rough_outcome = SubtractSquareState.rough_outcome
+    child_rough_outcomes = SubtractSquareState.child_rough_outcomes
+
+    def __init__(self, is_p1_turn: bool, current_total: int) -> None:
+        """
+        Initialize this game state and set the current player based on
+        is_p1_turn.
+        """
+        object.__setattr__(self, 'p1_turn', is_p1_turn)
+        object.__setattr__(self, 'current_total', current_total)
+        object.__setattr__(self, 'moves', None)
+        object.__setattr__(self, 'value', None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Refuse to change this state.
+        """
+        raise AttributeError("{} is immutable".format(type(self).__name__))
+
+    def __reduce__(self) -> tuple:
+        """
+        Return how to rebuild this state, for pickle and copy.
+        """
+        return intern_state, (self.p1_turn, self.current_total)
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Return whether other is the same position as this state.
+        """
+        return (type(self) == type(other)
+                and self.p1_turn == other.p1_turn
+                and self.current_total == other.current_total)
+
+    def __hash__(self) -> int:
+        """
+        Return a hash of this state which agrees with __eq__.
+        """
+        return hash((self.p1_turn, self.current_total))
+
+    def get_possible_moves(self) -> list:
+        """
+        Return all possible moves that can be applied to this state.
+        """
+        if self.moves is None:
+            object.__setattr__(self, 'moves', tuple(
+                SubtractSquareState.get_possible_moves(self)))
+        return list(self.moves)
+
+    def make_move(self, move: Any) -> "CompactSubtractSquareState":
+        """
+        Return the GameState that results from applying move to this GameState.
+        """
+        if type(move) == str:
+            move = int(move)
+        return intern_state(not self.p1_turn, self.current_total - move)
+
+    def solved_value(self) -> int:
+        """
+        Return WIN if the current player can force a win from this state,
+        and LOSE otherwise.
+        """
+        if self.value is None:
+            object.__setattr__(self, 'value', self.WIN if SOLVER.is_win(
+                self.current_total) else self.LOSE)
+        return self.value
+
 
-        return self.DRAW
+# The shared state of every (p1_turn, current_total) interned so far. It is
+# emptied whenever it reaches INTERN_LIMIT states, and can be emptied with
+# INTERNED_STATES.clear() at any time: states handed out before that still
+# work, but are no longer shared with the ones handed out after.
+INTERNED_STATES = {}
+INTERN_LIMIT = 2 ** 18
+
+
+def intern_state(p1_turn: bool,
+                 current_total: int) -> CompactSubtractSquareState:
+    """
+    Return the shared CompactSubtractSquareState with p1_turn and
+    current_total, creating it the first time it is asked for.
+
+    >>> intern_state(True, 10) is intern_state(True, 11).make_move(1)
+    False
+    >>> intern_state(True, 10) is intern_state(False, 11).make_move(1)
+    True
+    """
+    key = (p1_turn, current_total)
+    state = INTERNED_STATES.get(key)
+    if state is None:
+        if len(INTERNED_STATES) >= INTERN_LIMIT:
+            INTERNED_STATES.clear()
+        state = CompactSubtractSquareState(p1_turn, current_total)
+        INTERNED_STATES[key] = state
+    return state
+
+
+# SQUARES[k - 1] is k ** 2, for every k up to the root of the largest total
+# asked about so far.
+SQUARES = []
+
+
+def squares_up_to(total: int) -> List[int]:
+    """
+    Return every positive square no greater than total, growing SQUARES as
+    needed.
+
+    >>> squares_up_to(20)
+    [1, 4, 9, 16]
+    >>> squares_up_to(0)
+    []
+    """
+    count = isqrt(total) if total > 0 else 0
+    for k in range(len(SQUARES) + 1, count + 1):
+        SQUARES.append(k ** 2)
+    return SQUARES[:count]
 
 
 def is_pos_square(n: int) -> bool:
@@ -79,8 +234,95 @@ def is_pos_square(n: int) -> bool:
     False
     >>> is_pos_square(9)
     True
+    >>> is_pos_square((10 ** 17 + 3) ** 2)
+    True
+    """
+    return 0 < n and isqrt(n) ** 2 == n
+
+
+# The rough outcomes already worked out, by total, for rough_outcome() to
+# reuse; None (the default) works each one out afresh. Set it to {} to turn
+# the cache on.
+ROUGH_OUTCOME_CACHE = None
+
+
+def rough_outcome_of(total: int,
+                     cache: Optional[Dict[int, int]] = None) -> int:
+    """
+    Return the rough outcome for the current player of a SubtractSquare
+    state with total: WIN if total is a square, LOSE if every move leaves
+    a square for the opponent, and DRAW otherwise.
+
+    Only the squares below total are looked at, and only until one of them
+    leaves a total which is not a square. If cache is not None, the
+    outcome is looked up in and added to it.
+
+    >>> [rough_outcome_of(total) for total in [0, 2, 4, 5, 6]]
+    [-1, -1, 1, -1, 0]
+    """
+    if cache is not None and total in cache:
+        return cache[total]
+    if is_pos_square(total):
+        outcome = GameState.WIN
+    else:
+        outcome = GameState.LOSE
+        for k in range(1, isqrt(total) + 1 if total > 0 else 1):
+            if not is_pos_square(total - k ** 2):
+                outcome = GameState.DRAW
+                break
+    if cache is not None:
+        cache[total] = outcome
+    return outcome
+
+
+# Totals up to which child_rough_outcomes_of can use NumPy: past this the
+# squares involved do not fit in an int64.
+NUMPY_LIMIT = 2 ** 62
+
+
+def square_mask(values: Any) -> Any:
+    """
+    Return a NumPy array which is True where values, an int64 array of
+    numbers below NUMPY_LIMIT, holds a positive perfect square.
+    """
+    positive = np.maximum(values, 1)
+    roots = np.sqrt(positive.astype(np.float64)).astype(np.int64)
+    # The float square root can be one off either way for large values.
+    roots -= roots * roots > positive
+    roots += (roots + 1) * (roots + 1) <= positive
+    return (values > 0) & (roots * roots == values)
+
+
+def child_rough_outcomes_of(total: int) -> List[int]:
+    """
+    Return the rough_outcome_of each total a move from total leads to, in
+    the order of squares_up_to(total).
+
+    With NumPy, every child is checked at once: first which are squares,
+    then, one square at a time, which of the rest still leave only
+    squares, dropping each child as soon as it is decided. Without it,
+    each child is worked out on its own, using ROUGH_OUTCOME_CACHE.
+
+    >>> child_rough_outcomes_of(11)
+    [0, 0, -1]
     """
-    return 0 < n and (round(n ** 0.5) ** 2 == n)
+    if np is None or total >= NUMPY_LIMIT:
+        return [rough_outcome_of(total - square, ROUGH_OUTCOME_CACHE)
+                for square in squares_up_to(total)]
+    children = total - np.arange(1, isqrt(max(total, 0)) + 1,
+                                 dtype=np.int64) ** 2
+    outcomes = np.full(len(children), GameState.DRAW, dtype=np.int64)
+    win = square_mask(children)
+    outcomes[win] = GameState.WIN
+    undecided = np.flatnonzero(~win)
+    k = 1
+    while len(undecided) > 0:
+        remainders = children[undecided] - k * k
+        # Every square below these children has left a square.
+        outcomes[undecided[remainders < 0]] = GameState.LOSE
+        undecided = undecided[square_mask(remainders)]
+        k += 1
+    return outcomes.tolist()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,126 @@
+"""
+A transposition table shared by the minimax strategies.
+
+NOTE: You do not have to run python-ta on this file.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from game_state import GameState
+
+
+class TranspositionTable:
+    """
+    A table remembering the solved value and best move of every position
+    that has already been searched.
+
+    Positions are keyed on GameState.__repr__, which every state promises
+    can be used for equality testing, so two states reached through
+    different move orders share one entry. States which define their own
+    __hash__ and __eq__ are used as keys themselves, which saves rendering
+    them on every lookup. States which define canonical() share one entry
+    with their reflections and rotations, with best moves stored as moves
+    of the canonical position and turned back on lookup.
+
+    Alpha-beta searches only learn bounds on some values, so each entry also
+    records whether its value is EXACT, a LOWER bound or an UPPER bound.
+
+    entries - a dictionary mapping a position key to (value, best move,
+              bound)
+    hits - the number of lookups that found an entry
+    misses - the number of lookups that did not find an entry
+    """
+    EXACT: int = 0
+    LOWER: int = 1
+    UPPER: int = 2
+    entries: Dict[Any, Tuple[int, Any, int]]
+    hits: int
+    misses: int
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty TranspositionTable.
+        """
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """
+        Return the number of positions stored in this TranspositionTable.
+        """
+        return len(self.entries)
+
+    @staticmethod
+    def locate(state: GameState) -> List[Any]:
+        """
+        Return [key, symmetry]: the key under which state is stored, and the
+        symmetry turning state into the stored position (0 or None if it is
+        state itself).
+        """
+        if hasattr(state, 'canonical'):
+            return state.canonical()
+        if type(state).__hash__ not in (None, object.__hash__):
+            return [state, None]
+        return [repr(state), None]
+
+    @staticmethod
+    def key(state: GameState) -> Any:
+        """
+        Return the key under which state is stored.
+        """
+        return TranspositionTable.locate(state)[0]
+
+    def lookup(self, state: GameState) -> Optional[Tuple[int, Any, int]]:
+        """
+        Return the (value, best move, bound) stored for state, or None if
+        state has not been searched yet.
+
+        The value is from the point of view of the current player of state.
+        """
+        key, symmetry = self.locate(state)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            if symmetry:
+                entry = (entry[0], state.original_move(entry[1], symmetry),
+                         entry[2])
+        return entry
+
+    def lookup_exact(self, state: GameState) -> Optional[Tuple[int, Any]]:
+        """
+        Return the (value, best move) stored for state if its value is
+        exact, or None otherwise.
+        """
+        entry = self.lookup(state)
+        if entry is None or entry[2] != self.EXACT:
+            return None
+        return entry[0], entry[1]
+
+    def store(self, state: GameState, value: int, best_move: Any,
+              bound: int = EXACT) -> None:
+        """
+        Remember that the current player of state can guarantee value by
+        playing best_move, where bound says whether value is EXACT or only
+        a LOWER or UPPER bound on the true value.
+        """
+        if (bound == self.LOWER and value >= GameState.WIN) or \
+                (bound == self.UPPER and value <= GameState.LOSE):
+            bound = self.EXACT
+        key, symmetry = self.locate(state)
+        if symmetry:
+            best_move = state.canonical_move(best_move, symmetry)
+        self.entries[key] = (value, best_move, bound)
+
+    def clear(self) -> None:
+        """
+        Forget every stored position.
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+if __name__ == "__main__":
+    from python_ta import check_all
+    check_all(config="a2_pyta.txt")
@@ -0,0 +1,230 @@
+"""
+A headless tournament runner for the games and strategies of a1 and a2.
+
+Every pair of strategies registered in an assignment's game_interface
+(except the interactive one) plays every game registered there, for every
+starting parameter, first player and repeat, without printing anything or
+asking for input. Games are shared out over worker processes, and one row
+per game is written to a CSV file.
+
+Run it from this directory, for example:
+
+    python tournament.py --games s h --strategies r ro mi \\
+        --parameters s=20,50 h=1,2 --repeats 4 --seed 0 --workers 4 \\
+        --output results.csv
+
+The two assignments have modules with the same names (game, strategy,
+game_interface, ...), so each worker process only ever loads one of them.
+"""
+import argparse
+import csv
+import importlib
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+ASSIGNMENTS = ['a1', 'a2']
+
+# Strategies which ask a person for their moves, and so are never played.
+INTERACTIVE_STRATEGIES = ['i']
+
+# The starting parameters each game is played from, by game key, given to
+# its constructor after the first player (the number to subtract from, or
+# the side length of the board); None for games which take none.
+DEFAULT_PARAMETERS = {'s': [20, 50], 'c': [None], 'h': [1, 2]}
+
+FIELDS = ['assignment', 'game', 'parameter', 'p1_strategy', 'p2_strategy',
+          'p1_starts', 'seed', 'winner', 'moves', 'seconds', 'latencies_us']
+
+# The game_interface module of the assignment a worker has loaded.
+LOADED = {}
+
+
+def load_assignment(assignment: str) -> None:
+    """
+    Load the game_interface of assignment in this worker process.
+    """
+    sys.path.insert(0, os.path.join(ROOT, assignment))
+    LOADED['game_interface'] = importlib.import_module('game_interface')
+
+
+def registered() -> List[List[str]]:
+    """
+    Return [game keys, strategy keys] registered in the loaded assignment.
+    """
+    interface = LOADED['game_interface']
+    return [list(interface.playable_games),
+            list(interface.usable_strategies)]
+
+
+def reset_strategies(seed: int) -> None:
+    """
+    Seed every source of randomness the strategies use, and forget what
+    they learned in earlier games, so a game plays the same whatever ran
+    in this worker before it.
+    """
+    random.seed(seed)
+    strategy = sys.modules.get('strategy')
+    if hasattr(strategy, 'TRANSPOSITION_TABLE'):
+        strategy.TRANSPOSITION_TABLE.clear()
+    mcts = sys.modules.get('mcts')
+    if hasattr(mcts, 'MCTS'):
+        mcts.MCTS.rng.seed(seed)
+        mcts.MCTS.root = None
+
+
+def play_match(match: Tuple, max_moves: int) -> List[Any]:
+    """
+    Play the game described by match, a tuple of (assignment, game key,
+    parameter, p1 strategy key, p2 strategy key, p1 starts, seed), and
+    return its row of results in the order of FIELDS.
+
+    The game stops with no winner after max_moves moves.
+    """
+    assignment, game_key, parameter, p1, p2, p1_starts, seed = match
+    interface = LOADED['game_interface']
+    reset_strategies(seed)
+    game_class = interface.playable_games[game_key]
+    if parameter is None:
+        game = game_class(p1_starts)
+    else:
+        game = game_class(p1_starts, parameter)
+    strategies = {'p1': interface.usable_strategies[p1],
+                  'p2': interface.usable_strategies[p2]}
+    latencies = []
+    state = game.current_state
+    while not game.is_over(state) and len(latencies) < max_moves:
+        start = time.perf_counter()
+        strategy = strategies[state.get_current_player_name()]
+        move = None
+        while not state.is_valid_move(move):
+            move = strategy(game)
+        latencies.append(time.perf_counter() - start)
+        state = state.make_move(move)
+        game.current_state = state
+    winner = ''
+    for player in ['p1', 'p2']:
+        if game.is_over(state) and game.is_winner(player):
+            winner = player
+    return [assignment, game_key, parameter, p1, p2, p1_starts, seed, winner,
+            len(latencies), '{:.6f}'.format(sum(latencies)),
+            ' '.join(str(round(latency * 1e6)) for latency in latencies)]
+
+
+def play_matches(matches: List[Tuple], max_moves: int) -> List[List[Any]]:
+    """
+    Play every match in matches, in this worker, and return their rows.
+    """
+    return [play_match(match, max_moves) for match in matches]
+
+
+def build_matches(assignment: str, games: List[str], strategies: List[str],
+                  parameters: Dict[str, List[Any]], repeats: int,
+                  seed: int) -> List[Tuple]:
+    """
+    Return a match of assignment for every game in games, parameter of it
+    in parameters, ordered pair of strategies in strategies, first player
+    and repeat, each with its own seed drawn from seed.
+    """
+    rng = random.Random('{}:{}'.format(seed, assignment))
+    matches = []
+    for game in games:
+        for parameter in parameters.get(game, [None]):
+            for p1 in strategies:
+                for p2 in strategies:
+                    for p1_starts in [True, False]:
+                        for _ in range(repeats):
+                            matches.append((assignment, game, parameter, p1,
+                                            p2, p1_starts,
+                                            rng.randrange(2 ** 31)))
+    return matches
+
+
+def run_assignment(assignment: str, games: List[str], strategies: List[str],
+                   parameters: Dict[str, List[Any]], repeats: int, seed: int,
+                   workers: int, max_moves: int) -> List[List[Any]]:
+    """
+    Return the rows of every match of assignment, among the games and
+    strategies it registers out of games and strategies (or all of them,
+    if those are empty), played over workers processes.
+    """
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context,
+                             initializer=load_assignment,
+                             initargs=(assignment,)) as pool:
+        game_keys, strategy_keys = pool.submit(registered).result()
+        games = [key for key in game_keys if not games or key in games]
+        strategies = [key for key in strategy_keys
+                      if key not in INTERACTIVE_STRATEGIES and
+                      (not strategies or key in strategies)]
+        matches = build_matches(assignment, games, strategies, parameters,
+                                repeats, seed)
+        # A few batches per worker keeps them all busy to the end without
+        # a round trip per game.
+        size = max(1, len(matches) // (workers * 4))
+        batches = [matches[i:i + size] for i in range(0, len(matches), size)]
+        rows = []
+        for batch in pool.map(play_matches, batches,
+                              [max_moves] * len(batches)):
+            rows.extend(batch)
+    return rows
+
+
+def parse_parameters(texts: List[str]) -> Dict[str, List[Any]]:
+    """
+    Return DEFAULT_PARAMETERS updated by texts, each of the form
+    'game=value,value,...'.
+
+    >>> parse_parameters(['s=5,7'])['s']
+    [5, 7]
+    """
+    parameters = dict(DEFAULT_PARAMETERS)
+    for text in texts:
+        game, values = text.split('=', 1)
+        parameters[game] = [int(value) for value in values.split(',')]
+    return parameters
+
+
+def main(argv: List[str]) -> None:
+    """
+    Run the tournament described by the command line arguments argv.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--assignments', nargs='+', default=ASSIGNMENTS,
+                        choices=ASSIGNMENTS)
+    parser.add_argument('--games', nargs='*', default=[],
+                        help="game keys to play (default: all)")
+    parser.add_argument('--strategies', nargs='*', default=[],
+                        help="strategy keys to play (default: all)")
+    parser.add_argument('--parameters', nargs='*', default=[],
+                        help="starting parameters, as game=value,value")
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--max-moves', type=int, default=200)
+    parser.add_argument('--output', default='tournament.csv')
+    args = parser.parse_args(argv)
+    parameters = parse_parameters(args.parameters)
+    start = time.perf_counter()
+    with open(args.output, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDS)
+        games = 0
+        for assignment in args.assignments:
+            rows = run_assignment(assignment, args.games, args.strategies,
+                                  parameters, args.repeats, args.seed,
+                                  args.workers, args.max_moves)
+            writer.writerows(rows)
+            games += len(rows)
+    print("{} games written to {} in {:.1f}s".format(
+        games, args.output, time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,85 @@
+"""
+Unittests for the headless tournament runner.
+
+Run them from this directory:  python -m unittest tournament_unittest_basic
+"""
+
+import csv
+import os
+import shutil
+import tempfile
+import unittest
+
+import tournament
+
+
+class TournamentUnitTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def run_tournament(self, name, *args):
+        """
+        Run a tournament with the command line arguments args, and return
+        the rows of the file it writes.
+        """
+        path = os.path.join(self.directory, name)
+        tournament.main(list(args) + ['--output', path])
+        with open(path, newline='') as file:
+            return list(csv.DictReader(file))
+
+    def test_matrix(self):
+        """
+        Test that a match is built for every game, parameter, ordered pair
+        of strategies, first player and repeat, with distinct seeds.
+        """
+        matches = tournament.build_matches('a2', ['s', 'h'], ['ro', 'mi'],
+                                           {'s': [3, 4, 5]}, 2, 0)
+        self.assertEqual(len(matches), (3 + 1) * 4 * 2 * 2)
+        self.assertEqual(len({match[-1] for match in matches}), len(matches))
+        self.assertEqual(matches, tournament.build_matches(
+            'a2', ['s', 'h'], ['ro', 'mi'], {'s': [3, 4, 5]}, 2, 0))
+
+    def test_plays_both_assignments(self):
+        """
+        Test that games of both assignments are played to the end, never
+        with the interactive strategy, and recorded with one latency per
+        move.
+        """
+        rows = self.run_tournament(
+            'results.csv', '--strategies', 'r', 'o', 'ro', 'mi', 'i',
+            '--parameters', 's=5,9', 'h=1', '--workers', '1')
+        games = {(row['assignment'], row['game']) for row in rows}
+        self.assertEqual(games, {('a1', 's'), ('a1', 'c'), ('a2', 's'),
+                                 ('a2', 'h')})
+        for row in rows:
+            self.assertNotIn('i', [row['p1_strategy'], row['p2_strategy']])
+            self.assertEqual(len(row['latencies_us'].split()),
+                             int(row['moves']))
+            if row['game'] != 'c':
+                self.assertIn(row['winner'], ['p1', 'p2'])
+        perfect = [row for row in rows if row['assignment'] == 'a2' and
+                   row['p1_strategy'] == row['p2_strategy'] == 'mi']
+        # 5 is lost for the player to move, and 9 won.
+        self.assertEqual([row['winner'] for row in perfect
+                          if row['game'] == 's'],
+                         ['p2', 'p1', 'p1', 'p2'])
+
+    def test_seeded(self):
+        """
+        Test that the same seed plays the same games, however many workers
+        share them out.
+        """
+        args = ['--assignments', 'a1', '--strategies', 'r',
+                '--parameters', 's=30', '--repeats', '3', '--seed', '7']
+        first = self.run_tournament('first.csv', *args, '--workers', '1')
+        second = self.run_tournament('second.csv', *args, '--workers', '2')
+        for row in first + second:
+            del row['seconds'], row['latencies_us']
+        self.assertEqual(first, second)
+
+
+if __name__ == "__main__":
+    unittest.main()